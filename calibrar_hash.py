@@ -0,0 +1,42 @@
+from time import perf_counter
+
+from passlib.handlers.sha2_crypt import sha512_crypt
+
+from core.configs import settings
+
+
+ROUNDS_AMOSTRA: int = 50_000
+REPETICOES: int = 5
+
+
+def calibrar(alvo_ms: int) -> int:
+    """
+    Mede o tempo do sha512_crypt neste host e retorna os rounds que atingem o alvo de latência
+    """
+    # Aquecimento, para não medir o custo de carregar o módulo
+    sha512_crypt.hash('calibragem', rounds=sha512_crypt.min_rounds)
+
+    tempos = []
+    for _ in range(REPETICOES):
+        inicio: float = perf_counter()
+        sha512_crypt.hash('calibragem', rounds=ROUNDS_AMOSTRA)
+        tempos.append(perf_counter() - inicio)
+
+    # Usa a mediana para não se deixar levar por picos do host
+    tempo_por_round: float = sorted(tempos)[len(tempos) // 2] / ROUNDS_AMOSTRA
+    rounds: int = int(alvo_ms / 1000 / tempo_por_round)
+
+    # Arredonda para o milhar e respeita os limites do algoritmo
+    rounds = round(rounds, -3)
+    return max(sha512_crypt.min_rounds, min(rounds, sha512_crypt.max_rounds))
+
+
+
+if __name__ == '__main__':
+    rounds: int = calibrar(settings.HASH_ALVO_MS)
+
+    print(f'Alvo: {settings.HASH_ALVO_MS} ms por hash')
+    print(f'Rounds atuais: {settings.HASH_ROUNDS}')
+    print(f'Rounds sugeridos: {rounds}')
+    print(f'Defina a variável de ambiente HASH_ROUNDS={rounds} para aplicar.')
+    print('As senhas existentes são atualizadas no próximo login de cada membro.')
@@ -1,6 +1,5 @@
 from fastapi.requests import Request
 
-from core.database import get_session
 from models.area_model import AreaModel
 from controllers.base_controller import BaseController
 
@@ -19,14 +18,13 @@ class AreaController(BaseController):
         # Instanciar o objeto
         area_obj: AreaModel = AreaModel(area=area)
         
-        # Cria a sessão e insere no banco de dados
-        async with get_session() as session:
+        # Insere pela sessão do request (o commit é feito no fim do request)
+        async with self.transacao() as session:
             session.add(area_obj)
-            await session.commit()
  
 
     async def put_crud(self, obj: object) -> None:
-        async with get_session() as session:
+        async with self.transacao() as session:
             area_obj: AreaModel = await session.get(self.model, obj.id)
 
             if area_obj:
@@ -38,5 +36,4 @@ class AreaController(BaseController):
                 if area and area != area_obj.area:
                     area_obj.area = area
                
-                await session.commit()
 
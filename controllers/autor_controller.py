@@ -1,15 +1,11 @@
-from typing import List, Optional
+from typing import List
 
-from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
 from fastapi.requests import Request
 from fastapi import UploadFile
 
-from aiofile import async_open
-
-from uuid import uuid4
-
-from core.configs import settings
-from core.database import get_session
+from core.imagens import agendar_variantes
+from core.uploads import ArquivoSalvo, salvar_upload
 from models.autor_model import AutorModel
 from models.tag_model import TagModel
 from controllers.base_controller import BaseController
@@ -17,21 +13,15 @@ from controllers.base_controller import BaseController
 
 class AutorController(BaseController):
 
+    perfis_carregamento = {
+        'lista': (selectinload(AutorModel.tags),),
+        'detalhe': (selectinload(AutorModel.tags),),
+    }
+
     def __init__(self, request: Request) -> None:
         super().__init__(request, AutorModel)
 
 
-    async def get_all_crud(self) -> Optional[List[AutorModel]]:
-        """
-        Retorna todos os registros do model
-        """
-        async with get_session() as session:
-            query = select(self.model)
-            result = await session.execute(query)
-
-            return result.scalars().unique().all()
-    
-
     async def post_crud(self) -> None:
         # Recebe dados do form
         form = await self.request.form()
@@ -40,31 +30,23 @@ class AutorController(BaseController):
         imagem: UploadFile = form.get('imagem')
         tags: List[str] = form.getlist('tag')
 
-        # Nome aleatório para a imagem
-        arquivo_ext: str = imagem.filename.split('.')[-1]
-        novo_nome: str = f"{str(uuid4())}.{arquivo_ext}"
+        # Grava a imagem em blocos, nomeada pelo hash do conteúdo, com limite de tamanho do tipo
+        arquivo: ArquivoSalvo = await salvar_upload(imagem, 'autor')
 
         # Instanciar o objeto
-        autor: AutorModel = AutorModel(nome=nome, imagem=novo_nome)
-
-        # Busca e adiciona as tags
-        for id_tag in tags:
-            tag = await self.get_objeto(model_obj=TagModel,id_obj=int(id_tag))
-            autor.tags.append(tag)
-
-        # Fazer o upload do arquivo
-        async with async_open(f"{settings.MEDIA}/autor/{novo_nome}", "wb") as afile:
-            await afile.write(imagem.file.read())
+        autor: AutorModel = AutorModel(nome=nome, imagem=arquivo.nome)
         
-        # Cria a sessão e insere no banco de dados
-        async with get_session() as session:
+        # Insere pela sessão do request (o commit é feito no fim do request)
+        async with self.transacao() as session:
+            # Busca todas as tags de uma vez, na mesma sessão do autor
+            autor.tags = await self.get_objetos_por_ids(session, TagModel, tags)
             session.add(autor)
-            await session.commit()
+            agendar_variantes(session, 'autor', arquivo.nome)
  
 
     async def put_crud(self, obj: object) -> None:
-        async with get_session() as session:
-            autor: AutorModel = await session.get(self.model, obj.id)
+        async with self.transacao() as session:
+            autor: AutorModel = await session.get(self.model, obj.id, options=[selectinload(AutorModel.tags)])
 
             if autor:
                 # Recebe os dados do form
@@ -77,23 +59,11 @@ class AutorController(BaseController):
                 if nome and nome != autor.nome:
                     autor.nome = nome
                 if tags:
-                    # Se houver tags, zeramos as presentes no autor
-                    autor.tags = []
-                    await session.commit()
-                    # Busca e adiciona as tags
-                    for id_tag in tags:
-                        tag = await self.get_objeto(model_obj=TagModel, id_obj=int(id_tag))
-                        # Operação para juntar o objeto tag que vem de outra
-                        # sessão com o objeto autor que está nesta sessão.
-                        tag_local = await session.merge(tag)
-                        autor.tags.append(tag_local)
+                    # Aplica só as tags removidas e as adicionadas, no mesmo commit
+                    await self.sincronizar_colecao(session, autor.tags, TagModel, tags)
                 if imagem.filename:
-                    # Gera um nome aleatório
-                    arquivo_ext: str = imagem.filename.split('.')[-1]
-                    novo_nome: str = f"{str(uuid4())}.{arquivo_ext}"
-                    autor.imagem = novo_nome
-                    # Faz o upload da imagem
-                    async with async_open(f"{settings.MEDIA}/autor/{novo_nome}", "wb") as afile:
-                        await afile.write(imagem.file.read())
-                await session.commit()
+                    # Grava a nova imagem em blocos
+                    arquivo: ArquivoSalvo = await salvar_upload(imagem, 'autor')
+                    autor.imagem = arquivo.nome
+                    agendar_variantes(session, 'autor', arquivo.nome)
 
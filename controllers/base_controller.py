@@ -1,41 +1,415 @@
-from typing import Optional, List
+import json
+from contextlib import asynccontextmanager
+from functools import wraps
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, List, NamedTuple, Sequence, Set, Tuple
 
 from fastapi.requests import Request
+from sqlalchemy import delete, inspect, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import InstrumentedAttribute, raiseload
+from sqlalchemy.sql import Select
 
-from core.database import get_session
+from core.cache import CacheTTL
+from core.configs import settings
+from core.database import (apos_commit, em_janela_escrita, get_session, get_sessao_leitura_request, get_sessao_request,
+                           request_escreveu)
+from core.metricas import registrar_fonte
+from core.referencias import referencias
+from models.area_model import AreaModel
 from models.tag_model import TagModel
 from models.autor_model import AutorModel
 from models.post_model import PostModel
 
 
+class Pagina(NamedTuple):
+    """Uma página da listagem com os cursores para a próxima e a anterior"""
+    itens: List[object]
+    proximo: Optional[str]
+    anterior: Optional[str]
+
+
+class Opcao(NamedTuple):
+    """Projeção (id, label) usada nos selects e checkboxes dos formulários"""
+    id: int
+    label: str
+
+
+# Tabelas de referência servidas da memória pelo get_opcoes (model -> coluna do label).
+# Escritas pelo controller do próprio model invalidam o retrato após o commit.
+REFERENCIAS: Dict[object, str] = {TagModel: 'tag', AreaModel: 'area', AutorModel: 'nome'}
+
+# Cache por chave primária de cada model com cache ativado no controller
+# (preenchido quando o controller é instanciado)
+CACHES_ENTIDADE: Dict[object, CacheTTL] = {}
+
+# Model exibido junto das entidades em cache -> caches que o exibem. Ex: renomear um autor
+# esvazia o cache de posts (escritas nestes models são raras; listar os posts afetados não)
+DEPENDENCIAS_CACHE: Dict[object, List[CacheTTL]] = {}
+
+
+class RetratoEntidade:
+    """
+    Cópia somente leitura de uma entidade, guardada no cache e compartilhada entre requests:
+    colunas, os relacionamentos carregados pelo perfil (também retratos; coleções viram tuplas)
+    e as @property do model. Atribuições levantam erro; relacionamentos fora do perfil também,
+    como no raiseload.
+    """
+    __slots__ = ('_classe', '_valores')
+
+    def __init__(self, classe: type, valores: Dict[str, Any]) -> None:
+        object.__setattr__(self, '_classe', classe)
+        object.__setattr__(self, '_valores', valores)
+
+
+    @classmethod
+    def de(cls, obj: object, retratos: Optional[Dict[int, 'RetratoEntidade']] = None) -> 'RetratoEntidade':
+        """
+        Retrato de uma instância carregada (e dos relacionamentos já carregados dela)
+        """
+        retratos = {} if retratos is None else retratos
+        if id(obj) in retratos:
+            return retratos[id(obj)]
+
+        estado = inspect(obj)
+        valores: Dict[str, Any] = {}
+        retrato: RetratoEntidade = cls(type(obj), valores)
+        retratos[id(obj)] = retrato
+
+        for coluna in estado.mapper.column_attrs:
+            valores[coluna.key] = getattr(obj, coluna.key)
+
+        for relacionamento in estado.mapper.relationships:
+            if relacionamento.key in estado.unloaded:
+                continue
+
+            valor = getattr(obj, relacionamento.key)
+            if relacionamento.uselist:
+                valores[relacionamento.key] = tuple(cls.de(item, retratos) for item in valor)
+            else:
+                valores[relacionamento.key] = cls.de(valor, retratos) if valor is not None else None
+
+        return retrato
+
+
+    def __getattr__(self, nome: str) -> Any:
+        valores: Dict[str, Any] = object.__getattribute__(self, '_valores')
+        if nome in valores:
+            return valores[nome]
+
+        classe: type = object.__getattribute__(self, '_classe')
+        atributo = getattr(classe, nome, None)
+
+        if isinstance(atributo, property):
+            return atributo.fget(self)
+        if nome in inspect(classe).relationships.keys():
+            raise InvalidRequestError(f"'{classe.__name__}.{nome}' não foi carregado no retrato do cache")
+
+        raise AttributeError(nome)
+
+
+    def __setattr__(self, nome: str, valor: Any) -> None:
+        raise TypeError(f'{self._classe.__name__} do cache de entidades é somente leitura')
+
+
+    def __repr__(self) -> str:
+        return f'<Retrato {self._classe.__name__} id={self._valores.get("id")}>'
+
+
+def invalidar_no_cache(session: AsyncSession, cache: CacheTTL, ids: Iterable[int]) -> None:
+    """
+    Descarta os ids do cache informado depois do commit da sessão
+    """
+    ids = {int(id_obj) for id_obj in ids}
+
+    if ids:
+        apos_commit(session, lambda: [cache.invalidar(id_obj) for id_obj in ids])
+
+
+def invalidar_entidades(session: AsyncSession, model_obj: object, ids: Iterable[int]) -> None:
+    """
+    Descarta os ids do cache de entidades do model depois do commit da sessão
+    """
+    cache: Optional[CacheTTL] = CACHES_ENTIDADE.get(model_obj)
+
+    if cache is not None:
+        invalidar_no_cache(session, cache, ids)
+
+
+def invalidar_dependentes(session: AsyncSession, model_obj: object) -> None:
+    """
+    Esvazia, depois do commit da sessão, os caches que exibem registros de model_obj
+    """
+    caches: List[CacheTTL] = DEPENDENCIAS_CACHE.get(model_obj, [])
+
+    if caches:
+        apos_commit(session, lambda: [cache.limpar() for cache in caches])
+
+
+def invalidando_cache(parametro: str, extrair_id: Callable[[Any], int]) -> Callable:
+    """
+    Envolve um método de escrita (put_crud/del_crud) para descartar do cache de
+    entidades, após o commit, o registro identificado pelo argumento `parametro`
+    e esvaziar os caches que o exibem (DEPENDENCIAS_CACHE)
+    """
+    def decorador(metodo: Callable) -> Callable:
+        if getattr(metodo, 'invalida_cache', False):
+            return metodo
+
+        @wraps(metodo)
+        async def envolto(self, *args, **kwargs):
+            # Uma sobrescrita que chama super().del_crud passa por dois métodos envolvidos:
+            # só a chamada de fora invalida
+            if self._invalidando_cache:
+                return await metodo(self, *args, **kwargs)
+
+            id_obj: int = int(extrair_id(kwargs[parametro] if parametro in kwargs else args[0]))
+
+            self._invalidando_cache = True
+            try:
+                resultado = await metodo(self, *args, **kwargs)
+            finally:
+                self._invalidando_cache = False
+
+            invalidar_entidades(self.session, self.model, [id_obj])
+            invalidar_dependentes(self.session, self.model)
+
+            return resultado
+
+        envolto.invalida_cache = True
+        return envolto
+
+    return decorador
+
+
+invalida_put = invalidando_cache('obj', lambda obj: obj.id)
+invalida_del = invalidando_cache('id_obj', lambda id_obj: id_obj)
+
+
 class BaseController:
 
+    # Colunas da paginação por keyset (a última precisa ser única, normalmente o id)
+    colunas_paginacao: Tuple[str, ...] = ('id',)
+    paginacao_desc: bool = False
+
+    # Ordenações alternativas da listagem (?ordem=<nome>): nome -> (colunas, desc).
+    # Cada uma precisa de um índice nas mesmas colunas.
+    ordenacoes: Dict[str, Tuple[Tuple[str, ...], bool]] = {}
+
+    # Eager loading por caso de uso ('lista', 'detalhe'). Relacionamentos fora
+    # do perfil não são carregados e geram erro se acessados.
+    perfis_carregamento: Dict[str, Tuple] = {}
+
+    # Cache de leitura por chave primária (opcional): com cache_ttl > 0, get_one_crud
+    # serve da memória retratos somente leitura (RetratoEntidade) do perfil 'detalhe'.
+    # Os put_crud e del_crud de todos os controllers invalidam a chave depois do commit
+    # (só no worker que escreveu); formulários de edição e put_crud leem do primário
+    # (get_one_crud(edicao=True)) e nunca partem de um retrato.
+    cache_ttl: int = 0
+    cache_tamanho: int = 256
+    cache_entidades: Optional[CacheTTL] = None
+
+    # Models exibidos no perfil 'detalhe': escritas neles esvaziam o cache de entidades
+    dependencias_cache: Tuple[object, ...] = ()
+
+    # True enquanto um put_crud/del_crud envolvido roda (ver invalidando_cache)
+    _invalidando_cache: bool = False
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+
+        if 'put_crud' in cls.__dict__:
+            cls.put_crud = invalida_put(cls.__dict__['put_crud'])
+        if 'del_crud' in cls.__dict__:
+            cls.del_crud = invalida_del(cls.__dict__['del_crud'])
+
+        if cls.cache_ttl and 'cache_ttl' in cls.__dict__:
+            cls.cache_entidades = CacheTTL(tamanho_max=cls.cache_tamanho, ttl=cls.cache_ttl)
+            registrar_fonte(f'cache_{cls.__name__}', cls.cache_entidades.stats)
+
+            for model_obj in cls.dependencias_cache:
+                DEPENDENCIAS_CACHE.setdefault(model_obj, []).append(cls.cache_entidades)
+
     def __init__(self, request: Request, model: object) -> None:
         self.request: Request = request
         self.model: object = model
 
+        if self.cache_entidades is not None:
+            CACHES_ENTIDADE.setdefault(model, self.cache_entidades)
+
 
-    async def get_all_crud(self) -> Optional[List[object]]:
+    @property
+    def session(self) -> AsyncSession:
         """
-        Retorna todos os registros do model
+        Sessão do request (unidade de trabalho), a mesma para todos os controllers.
+        O commit ou rollback acontece uma única vez, no fim do request.
         """
-        async with get_session() as session:
-            query = select(self.model)
-            result = await session.execute(query)
+        return get_sessao_request(self.request)
+
 
-            return result.scalars().unique().all()
+    @property
+    def session_leitura(self) -> AsyncSession:
+        """
+        Sessão para consultas somente leitura (réplica, quando configurada).
+        Escritas sempre usam self.session.
+        """
+        return get_sessao_leitura_request(self.request)
 
 
-    async def get_one_crud(self, id_obj: int) -> Optional[object]:
+    @asynccontextmanager
+    async def transacao(self) -> AsyncIterator[AsyncSession]:
         """
-        Retorna o objeto especificado pelo id_obj ou None
+        Bloco de escrita: envia as alterações ao banco (flush) ao final ou
+        desfaz a unidade de trabalho se algo falhar no meio
         """
-        async with get_session() as session:
-            obj: self.model = await session.get(self.model, id_obj)
+        session: AsyncSession = self.session
+        try:
+            yield session
+            await session.flush()
+        except Exception:
+            await session.rollback()
+            raise
+
+        if self.model in REFERENCIAS:
+            apos_commit(session, lambda: referencias.invalidar(self.model.__tablename__))
+
 
+    def opcoes_carregamento(self, perfil: str) -> list:
+        """
+        Retorna as opções de carregamento dos relacionamentos para o perfil informado
+        """
+        return [*self.perfis_carregamento.get(perfil, ()), raiseload('*')]
+
+
+    def query_lista(self) -> Select:
+        """
+        Retorna a query base da listagem do model
+        """
+        return select(self.model).options(*self.opcoes_carregamento('lista'))
+
+
+    async def get_all_crud(self, cursor: Optional[str] = None, anterior: bool = False, tamanho: Optional[int] = None,
+                           query: Optional[Select] = None, ordem: Optional[str] = None) -> Pagina:
+        """
+        Retorna uma página de registros do model, paginada por keyset a partir do cursor.
+        A query base é a query_lista(), a não ser que outra seja informada (ex: com filtro).
+        `ordem` escolhe uma das ordenações alternativas; nomes desconhecidos usam a padrão.
+        """
+        tamanho = min(tamanho or settings.ADMIN_PAGINA_TAMANHO, settings.ADMIN_PAGINA_MAX)
+        nomes, ordem_desc = self.ordenacoes.get(ordem, (self.colunas_paginacao, self.paginacao_desc))
+        colunas = [getattr(self.model, nome) for nome in nomes]
+
+        # Voltando uma página, a ordem é invertida e o resultado desinvertido no final
+        desc: bool = ordem_desc != anterior
+        query = (query if query is not None else self.query_lista()).order_by(*[c.desc() if desc else c.asc() for c in colunas])
+
+        if cursor:
+            chave = tuple_(*colunas)
+            valores = tuple_(*self.__ler_cursor(cursor, nomes))
+            query = query.where(chave < valores if desc else chave > valores)
+
+        result = await self.session_leitura.execute(query.limit(tamanho + 1))
+        itens: List[object] = result.scalars().unique().all()
+
+        tem_mais: bool = len(itens) > tamanho
+        itens = itens[:tamanho]
+
+        if anterior:
+            itens.reverse()
+            proximo = self.__gerar_cursor(itens[-1], nomes) if itens else None
+            anterior_cursor = self.__gerar_cursor(itens[0], nomes) if itens and tem_mais else None
+        else:
+            proximo = self.__gerar_cursor(itens[-1], nomes) if itens and tem_mais else None
+            anterior_cursor = self.__gerar_cursor(itens[0], nomes) if itens and cursor else None
+
+        return Pagina(itens=itens, proximo=proximo, anterior=anterior_cursor)
+
+
+    def __gerar_cursor(self, obj: object, nomes: Tuple[str, ...]) -> str:
+        valores = []
+        for nome in nomes:
+            valor = getattr(obj, nome)
+            valores.append(valor.isoformat() if isinstance(valor, datetime) else valor)
+
+        return urlsafe_b64encode(json.dumps(valores).encode('utf-8')).decode('ascii')
+
+
+    def __ler_cursor(self, cursor: str, nomes: Tuple[str, ...]) -> list:
+        """
+        Decodifica o cursor e confere quantidade e tipo de cada valor contra as colunas.
+        Qualquer cursor malformado levanta ValueError (404 nas views), nunca erro do banco.
+        """
+        try:
+            valores = json.loads(urlsafe_b64decode(cursor.encode('ascii')))
+        except ValueError:
+            raise ValueError('Cursor de paginação inválido')
+
+        if not isinstance(valores, list) or len(valores) != len(nomes):
+            raise ValueError('Cursor de paginação inválido')
+
+        for i, nome in enumerate(nomes):
+            valores[i] = self.__valor_cursor(getattr(self.model, nome).type.python_type, valores[i])
+
+        return valores
+
+
+    @staticmethod
+    def __valor_cursor(tipo: type, valor: Any) -> Any:
+        """
+        Converte um valor do cursor para o tipo da coluna ou levanta ValueError
+        """
+        if tipo is datetime and isinstance(valor, str):
+            data: datetime = datetime.fromisoformat(valor)
+            if data.tzinfo is None:
+                return data
+        elif tipo is int and type(valor) is int and -2**31 <= valor < 2**31:
+            # Integer é int4 no Postgres: fora da faixa o banco levantaria DataError
+            return valor
+        elif tipo is str and isinstance(valor, str):
+            return valor
+
+        raise ValueError('Cursor de paginação inválido')
+
+
+    async def get_one_crud(self, id_obj: int, edicao: bool = False) -> Optional[object]:
+        """
+        Retorna o objeto especificado pelo id_obj ou None.
+        Com edicao=True (formulário de edição e o POST que chama put_crud) lê sempre do
+        primário, sem o cache: um formulário montado de uma cópia atrasada, ao ser salvo,
+        sobrescreveria a escrita mais nova.
+        """
+        if edicao:
+            obj: self.model = await self.session.get(self.model, id_obj, options=self.opcoes_carregamento('detalhe'))
             return obj
 
+        cache: Optional[CacheTTL] = self.cache_entidades
+
+        # Sem cache, com escritas do próprio request ainda não confirmadas ou logo depois de uma
+        # escrita do navegador (janela da réplica): vai ao banco pela sessão do request
+        if cache is None or request_escreveu(self.request) or em_janela_escrita(self.request):
+            obj = await self.session_leitura.get(self.model, id_obj, options=self.opcoes_carregamento('detalhe'))
+            return obj
+
+        chave: int = int(id_obj)
+        obj = cache.get(chave)
+        if obj is not None:
+            return obj
+
+        # Carrega no primário, numa sessão própria, e guarda um retrato somente leitura:
+        # o mesmo objeto é compartilhado entre requests
+        invalidacoes: int = cache.invalidacoes
+        async with get_session() as session:
+            obj = await session.get(self.model, chave, options=self.opcoes_carregamento('detalhe'))
+            retrato: Optional[RetratoEntidade] = RetratoEntidade.de(obj) if obj is not None else None
+
+        if retrato is not None and cache.invalidacoes == invalidacoes:
+            cache.set(chave, retrato)
+
+        return retrato
+
 
     async def post_crud(self) -> None:
         raise NotImplementedError("Você precisa implementar este método.")
@@ -45,34 +419,128 @@ class BaseController:
         raise NotImplementedError("Você precisa implementar este método.")
     
     
-    async def del_crud(self, id_obj: int) -> None:
-        async with get_session() as session:
-            obj: self.model = await session.get(self.model, id_obj)
+    @invalida_del
+    async def del_crud(self, id_obj: int) -> Optional[int]:
+        """
+        Remove o registro com um único DELETE ... RETURNING, sem carregá-lo.
+        Associações e filhos saem pelo ON DELETE CASCADE do banco.
+        Retorna o id removido ou None se não existia.
+        """
+        query = delete(self.model).where(self.model.id == id_obj).returning(self.model.id)
 
-            if obj:
-                await session.delete(obj)
-                await session.commit()
+        async with self.transacao() as session:
+            result = await session.execute(query.execution_options(synchronize_session=False))
+            id_removido: Optional[int] = result.scalar_one_or_none()
+
+        return id_removido
 
        
     # Métodos genéricos
 
     async def get_objetos(self, model_obj) -> Optional[List[object]]:
         """
-        Retorna todos os registros de objectos
+        Retorna todos os registros de objectos, sem carregar relacionamentos (dropdowns)
         """
-        async with get_session() as session:
-            query = select(model_obj)
-            result = await session.execute(query)
-            objetos: Optional[List[model_obj]] = result.scalars().unique().all()
+        query = select(model_obj).options(raiseload('*'))
+        result = await self.session_leitura.execute(query)
+        objetos: Optional[List[model_obj]] = result.scalars().unique().all()
 
         return objetos
     
-    async def get_objeto(self, model_obj:object, id_obj:int) -> Optional[object]:
+    async def get_opcoes(self, model_obj: object, coluna_label: str, ordem: Optional[object] = None,
+                         filtro: Optional[object] = None, limite: Optional[int] = None) -> Sequence[Opcao]:
         """
-        Retorna o objeto especificado pelo id_obj ou None
+        Retorna somente (id, label) dos registros de model_obj, para preencher os formulários.
+        Por padrão ordena pelo label; aceita uma expressão de filtro e um limite.
+        Tabelas de REFERENCIAS sem filtro, limite ou ordem vêm do retrato em memória (tupla imutável).
         """
+        if ordem is None and filtro is None and limite is None and REFERENCIAS.get(model_obj) == coluna_label:
+            return await referencias.obter(model_obj.__tablename__, lambda: self.__carregar_referencia(model_obj, coluna_label))
+
+        coluna = getattr(model_obj, coluna_label)
+        query = select(model_obj.id, coluna).order_by(ordem if ordem is not None else coluna)
+
+        if filtro is not None:
+            query = query.where(filtro)
+        if limite:
+            query = query.limit(limite)
+
+        result = await self.session_leitura.execute(query)
+        opcoes: List[Opcao] = [Opcao(id=linha[0], label=linha[1]) for linha in result.all()]
+
+        return opcoes
+
+
+    async def __carregar_referencia(self, model_obj: object, coluna_label: str) -> Tuple[Opcao, ...]:
+        """
+        Consulta o retrato de uma tabela de referência no banco principal (nunca na réplica,
+        para não guardar em memória uma leitura atrasada), fora da sessão do request
+        """
+        coluna = getattr(model_obj, coluna_label)
+        query = select(model_obj.id, coluna).order_by(coluna)
+
         async with get_session() as session:
-            objeto: model_obj = await session.get(model_obj, id_obj)
+            result = await session.execute(query)
+
+        return tuple(Opcao(id=linha[0], label=linha[1]) for linha in result.all())
+
+    async def get_objetos_por_ids(self, session: AsyncSession, model_obj: object, ids: Iterable[int]) -> List[object]:
+        """
+        Busca vários registros de uma vez (WHERE id IN ...) dentro da sessão informada
+        """
+        ids = {int(id_obj) for id_obj in ids}
+        if not ids:
+            return []
+
+        query = select(model_obj).where(model_obj.id.in_(ids)).options(raiseload('*'))
+        result = await session.execute(query)
+
+        return result.scalars().all()
+
+
+    async def sincronizar_colecao(self, session: AsyncSession, colecao: List[object], model_obj: object,
+                                  ids: Iterable[int]) -> Tuple[Set[int], Set[int]]:
+        """
+        Atualiza uma coleção muitos-para-muitos aplicando apenas os ids removidos e os adicionados.
+        Retorna (ids adicionados, ids removidos).
+        """
+        novos = {int(id_obj) for id_obj in ids}
+        atuais = {obj.id for obj in colecao}
+
+        for obj in [obj for obj in colecao if obj.id not in novos]:
+            colecao.remove(obj)
+
+        adicionados: List[object] = await self.get_objetos_por_ids(session, model_obj, novos - atuais)
+        colecao.extend(adicionados)
+
+        return {obj.id for obj in adicionados}, atuais - novos
+
+
+    async def ajustar_contador(self, session: AsyncSession, contador: InstrumentedAttribute, ids: Iterable[int], delta: int) -> None:
+        """
+        Soma delta ao contador (ex: PostModel.total_comentarios) das linhas com os ids informados,
+        com um UPDATE relativo no banco: escritas concorrentes não perdem incrementos
+        """
+        ids = set(ids)
+        if not ids or not delta:
+            return
+
+        model_obj = contador.class_
+        query = update(model_obj).where(model_obj.id.in_(ids)).values({contador.key: contador + delta})
+
+        await session.execute(query.execution_options(synchronize_session=False))
+        invalidar_entidades(session, model_obj, ids)
+
+    async def get_objeto(self, model_obj:object, id_obj:int) -> Optional[object]:
+        """
+        Retorna o objeto especificado pelo id_obj ou None (do cache de entidades, se já estiver nele)
+        """
+        cache: Optional[CacheTTL] = CACHES_ENTIDADE.get(model_obj)
+        usar_cache: bool = cache is not None and not request_escreveu(self.request) and not em_janela_escrita(self.request)
+        objeto: Optional[model_obj] = cache.get(int(id_obj)) if usar_cache else None
+
+        if objeto is None:
+            objeto = await self.session_leitura.get(model_obj, id_obj)
 
         return objeto
     
\ No newline at end of file
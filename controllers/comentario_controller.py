@@ -1,12 +1,28 @@
+from typing import List, Optional
+
 from fastapi.requests import Request
+from sqlalchemy import delete
+from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload, raiseload
 
-from core.database import get_session
+from core.configs import settings
 from models.comentario_model import ComentarioModel
-from controllers.base_controller import BaseController
+from models.post_model import PostModel
+from controllers.base_controller import BaseController, Opcao, Pagina
 
 
 class ComentarioController(BaseController):
 
+    # Listagem do mais novo para o mais antigo
+    colunas_paginacao = ('data', 'id')
+    paginacao_desc = True
+
+    # Do post só precisamos das colunas (título/id), nunca das tags e comentários dele
+    perfis_carregamento = {
+        'lista': (joinedload(ComentarioModel.post).raiseload('*'),),
+        'detalhe': (joinedload(ComentarioModel.post).raiseload('*'),),
+    }
+
     def __init__(self, request: Request) -> None:
         super().__init__(request, ComentarioModel)
     
@@ -21,14 +37,14 @@ class ComentarioController(BaseController):
         # Instanciar o objeto
         comentario: ComentarioModel = ComentarioModel(id_post=int(post_id), autor=autor, texto=texto)
  
-        # Cria a sessão e insere no banco de dados
-        async with get_session() as session:
+        # Insere pela sessão do request (o commit é feito no fim do request)
+        async with self.transacao() as session:
             session.add(comentario)
-            await session.commit()
+            await self.ajustar_contador(session, PostModel.total_comentarios, [comentario.id_post], 1)
  
 
     async def put_crud(self, obj: object) -> None:
-        async with get_session() as session:
+        async with self.transacao() as session:
             comentario: ComentarioModel = await session.get(self.model, obj.id)
 
             if comentario:
@@ -40,11 +56,55 @@ class ComentarioController(BaseController):
                 texto: str = form.get('texto')
 
                 if post_id and int(post_id) != comentario.id_post:
+                    # O comentário muda de post: os dois contadores mudam juntos
+                    await self.ajustar_contador(session, PostModel.total_comentarios, [comentario.id_post], -1)
+                    await self.ajustar_contador(session, PostModel.total_comentarios, [int(post_id)], 1)
                     comentario.id_post = int(post_id)
                 if autor and autor != comentario.autor:
                     comentario.autor = autor
                 if texto and texto != comentario.texto:
                     comentario.texto = texto
                 
-                await session.commit()
 
+
+    async def del_crud(self, id_obj: int) -> Optional[int]:
+        """
+        Remove o comentário (DELETE ... RETURNING) e desconta do post na mesma transação
+        """
+        query = delete(ComentarioModel).where(ComentarioModel.id == id_obj).returning(ComentarioModel.id, ComentarioModel.id_post)
+
+        async with self.transacao() as session:
+            result = await session.execute(query.execution_options(synchronize_session=False))
+            linha = result.first()
+
+            if linha is None:
+                return None
+
+            await self.ajustar_contador(session, PostModel.total_comentarios, [linha.id_post], -1)
+
+        return linha.id
+
+
+    async def get_comentarios_post(self, id_post: int, cursor: Optional[str] = None, anterior: bool = False,
+                                   tamanho: Optional[int] = None) -> Pagina:
+        """
+        Retorna uma página dos comentários do post, do mais novo para o mais antigo
+        (PostModel.comentarios nunca é carregado inteiro)
+        """
+        query = select(ComentarioModel).where(ComentarioModel.id_post == id_post).options(raiseload('*'))
+
+        return await self.get_all_crud(cursor=cursor, anterior=anterior, tamanho=tamanho, query=query)
+
+
+    async def get_opcoes_posts(self, id_selecionado: Optional[int] = None) -> List[Opcao]:
+        """
+        Opções do select de post: os settings.ADMIN_OPCOES_POSTS mais recentes e, se estiver
+        fora deles, o post já escolhido (nunca um <option> para cada post do banco)
+        """
+        opcoes: List[Opcao] = list(await self.get_opcoes(model_obj=PostModel, coluna_label='titulo', ordem=PostModel.data.desc(),
+                                                         limite=settings.ADMIN_OPCOES_POSTS))
+
+        if id_selecionado and all(opcao.id != id_selecionado for opcao in opcoes):
+            opcoes.extend(await self.get_opcoes(model_obj=PostModel, coluna_label='titulo', filtro=PostModel.id == id_selecionado))
+
+        return opcoes
@@ -2,8 +2,8 @@ from typing import Optional, List
 
 from fastapi.requests import Request
 from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload
 
-from core.database import get_session
 from models.duvida_model import DuvidaModel
 from models.area_model import AreaModel
 from controllers.base_controller import BaseController
@@ -11,6 +11,11 @@ from controllers.base_controller import BaseController
 
 class DuvidaController(BaseController):
 
+    perfis_carregamento = {
+        'lista': (joinedload(DuvidaModel.area),),
+        'detalhe': (joinedload(DuvidaModel.area),),
+    }
+
     def __init__(self, request: Request) -> None:
         super().__init__(request, DuvidaModel)
     
@@ -27,14 +32,13 @@ class DuvidaController(BaseController):
         # Instanciar o objeto
         duvida: DuvidaModel = DuvidaModel(id_area=int(area_id), titulo=titulo, resposta=resposta)
   
-        # Cria a sessão e insere no banco de dados
-        async with get_session() as session:
+        # Insere pela sessão do request (o commit é feito no fim do request)
+        async with self.transacao() as session:
             session.add(duvida)
-            await session.commit()
  
 
     async def put_crud(self, obj: object) -> None:
-        async with get_session() as session:
+        async with self.transacao() as session:
             duvida: DuvidaModel = await session.get(self.model, obj.id)
 
             if duvida:
@@ -52,7 +56,6 @@ class DuvidaController(BaseController):
                 if resposta and resposta != duvida.resposta:
                     duvida.resposta = resposta
                 
-                await session.commit()
 
 
     @property
@@ -60,10 +63,9 @@ class DuvidaController(BaseController):
         """
         Retorna todos os registros de area
         """
-        async with get_session() as session:
-            query = select(AreaModel)
-            result = await session.execute(query)
-            areas: Optional[List[AreaModel]] = result.scalars().all()
+        query = select(AreaModel)
+        result = await self.session_leitura.execute(query)
+        areas: Optional[List[AreaModel]] = result.scalars().all()
 
-            return areas
+        return areas
 
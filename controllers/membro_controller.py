@@ -3,18 +3,23 @@ from fastapi.requests import Request
 from fastapi import UploadFile
 from sqlalchemy.future import select
 
-from aiofile import async_open
-
-from uuid import uuid4
-
-from core.auth import verificar_senha
-from core.auth import gerar_hash_senha
+from core.auth import precisa_rehash
+from core.cache import CacheTTL
 from core.configs import settings
-from core.database import get_session
+from core.database import apos_commit, get_session
+from core.metricas import registrar_fonte
+from core.servico_hash import servico_hash
+from core.imagens import agendar_variantes
+from core.uploads import ArquivoSalvo, salvar_upload
 from models.membro_model import MembroModel
 from controllers.base_controller import BaseController
 
 
+# Membros autenticados, usados a cada request do admin
+membro_cache: CacheTTL = CacheTTL(tamanho_max=settings.MEMBRO_CACHE_TAMANHO, ttl=settings.MEMBRO_CACHE_TTL)
+registrar_fonte('membro_cache', membro_cache.stats)
+
+
 class MembroController(BaseController):
 
     def __init__(self, request: Request) -> None:
@@ -28,28 +33,23 @@ class MembroController(BaseController):
         funcao: str = form.get('funcao')
         imagem: UploadFile = form.get('imagem')
         email: str = form.get('email')
-        senha: str = form.get('senha') # Adicionar hash
-        hash_senha: str = gerar_hash_senha(senha=senha)
+        senha: str = form.get('senha')
+        hash_senha: str = await servico_hash.gerar_hash(senha=senha)
 
-        # Nome aleatório para a imagem
-        arquivo_ext: str = imagem.filename.split('.')[-1]
-        novo_nome: str = f"{str(uuid4())}.{arquivo_ext}"
+        # Grava a imagem em blocos, nomeada pelo hash do conteúdo, com limite de tamanho do tipo
+        arquivo: ArquivoSalvo = await salvar_upload(imagem, 'membro')
 
         # Instanciar o objeto
-        membro: MembroModel = MembroModel(nome=nome, funcao=funcao, imagem=novo_nome, email=email, senha=hash_senha)
-
-        # Fazer o upload do arquivo
-        async with async_open(f"{settings.MEDIA}/membro/{novo_nome}", "wb") as afile:
-            await afile.write(imagem.file.read())
+        membro: MembroModel = MembroModel(nome=nome, funcao=funcao, imagem=arquivo.nome, email=email, senha=hash_senha)
         
-        # Cria a sessão e insere no banco de dados
-        async with get_session() as session:
+        # Insere pela sessão do request (o commit é feito no fim do request)
+        async with self.transacao() as session:
             session.add(membro)
-            await session.commit()
+            agendar_variantes(session, 'membro', arquivo.nome)
  
 
     async def put_crud(self, obj: object) -> None:
-        async with get_session() as session:
+        async with self.transacao() as session:
             membro: MembroModel = await session.get(self.model, obj.id)
 
             if membro:
@@ -60,8 +60,7 @@ class MembroController(BaseController):
                 funcao: str = form.get('funcao')
                 imagem: UploadFile = form.get('imagem')
                 email: str = form.get('email')
-                senha: str = form.get('senha') # Adicionar hash
-                hash_senha: str = gerar_hash_senha(senha=senha)
+                senha: str = form.get('senha')
 
                 if nome and nome != membro.nome:
                     membro.nome = nome
@@ -69,24 +68,54 @@ class MembroController(BaseController):
                     membro.funcao = funcao
                 if email and email != membro.email:
                     membro.email = email 
-                if senha and hash_senha != membro.senha:
-                    membro.senha = hash_senha# Adicionar Hash
+                if senha:
+                    # Só gera o hash quando uma nova senha foi informada. A nova versão
+                    # derruba as sessões abertas do membro em todos os workers.
+                    membro.senha = await servico_hash.gerar_hash(senha=senha)
+                    membro.versao_token = (membro.versao_token or 0) + 1
                 if imagem.filename:
-                    # Gera um nome aleatório
-                    arquivo_ext: str = imagem.filename.split('.')[-1]
-                    novo_nome: str = f"{str(uuid4())}.{arquivo_ext}"
-                    membro.imagem = novo_nome
-                    # Faz o upload da imagem
-                    async with async_open(f"{settings.MEDIA}/{novo_nome}", "wb") as afile:
-                        await afile.write(imagem.file.read())
-                await session.commit()
+                    # Grava a nova imagem em blocos
+                    arquivo: ArquivoSalvo = await salvar_upload(imagem, 'membro')
+                    membro.imagem = arquivo.nome
+                    agendar_variantes(session, 'membro', arquivo.nome)
+
+            # Permissões e dados alterados passam a valer já no próximo request (neste worker)
+            apos_commit(session, lambda: membro_cache.invalidar(obj.id))
+
+
+    async def del_crud(self, id_obj: int) -> Optional[int]:
+        id_removido: Optional[int] = await super().del_crud(id_obj=id_obj)
+
+        if id_removido:
+            apos_commit(self.session, lambda: membro_cache.invalidar(id_obj))
+
+        return id_removido
+
+
+    async def get_membro_autenticado(self, membro_id: int) -> Optional[MembroModel]:
+        """
+        Retorna o membro logado, consultando o banco apenas quando não estiver em cache
+        """
+        membro: Optional[MembroModel] = membro_cache.get(membro_id)
+
+        if membro is None:
+            # Carrega no primário, numa sessão própria: a réplica pode estar atrasada logo depois de
+            # uma troca de permissão, e ao fechar a sessão o objeto fica destacado para o cache
+            invalidacoes: int = membro_cache.invalidacoes
+            async with get_session() as session:
+                membro = await session.get(MembroModel, membro_id)
+
+            if membro and membro_cache.invalidacoes == invalidacoes:
+                membro_cache.set(membro_id, membro)
+
+        return membro
 
 
     async def login_membro(self, email: str, senha: str) -> Optional[MembroModel]:
         """
         Busca e retorna o membro de acordo com os dados de acesso
         """
-        async with get_session() as session:
+        async with self.transacao() as session:
             query = select(MembroModel).filter(MembroModel.email == email)
             results = await session.execute(query)
 
@@ -94,8 +123,13 @@ class MembroController(BaseController):
 
             if not membro:
                 return None
-            if not verificar_senha(senha=senha, hash_senha=membro.senha):
+            if not await servico_hash.verificar(senha=senha, hash_senha=membro.senha):
                 return None
+
+            # Atualiza hashes gerados com outra política de custo (sem migração em massa)
+            if precisa_rehash(membro.senha):
+                membro.senha = await servico_hash.gerar_hash(senha=senha)
+                apos_commit(session, lambda: membro_cache.invalidar(membro.id))
             
             return membro
 
@@ -1,15 +1,15 @@
-from typing import List
+from typing import List, Optional
 
 from fastapi.requests import Request
 from fastapi import UploadFile
-
-from aiofile import async_open
-
-from uuid import uuid4
-
-from core.configs import settings
-from core.database import get_session
-from models.post_model import PostModel
+from sqlalchemy import update
+from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload, selectinload
+
+from core.imagens import agendar_variantes
+from core.uploads import ArquivoSalvo, salvar_upload
+from models.autor_model import AutorModel
+from models.post_model import PostModel, tags_post
 from models.tag_model import TagModel
 from controllers.base_controller import BaseController
 
@@ -17,6 +17,26 @@ from controllers.base_controller import BaseController
 
 class PostController(BaseController):
 
+    # Listagem do mais novo para o mais antigo
+    colunas_paginacao = ('data', 'id')
+    paginacao_desc = True
+
+    # ?ordem=comentarios: mais comentados primeiro (índice em total_comentarios, id)
+    ordenacoes = {'comentarios': (('total_comentarios', 'id'), True)}
+
+    # Detalhes servidos do cache de entidades. Autor e tags vêm junto: escritas neles
+    # esvaziam o cache de posts (o contador de comentários invalida só o post).
+    cache_ttl = 300
+    cache_tamanho = 512
+    dependencias_cache = (AutorModel, TagModel)
+
+    # Autor é muitos-para-um (join sem duplicar linhas); tags vêm em um SELECT ... IN separado.
+    # Os comentários não são carregados na listagem nem no detalhe.
+    perfis_carregamento = {
+        'lista': (joinedload(PostModel.autor).raiseload('*'), selectinload(PostModel.tags)),
+        'detalhe': (joinedload(PostModel.autor).raiseload('*'), selectinload(PostModel.tags)),
+    }
+
     def __init__(self, request: Request) -> None:
         super().__init__(request, PostModel)
     
@@ -30,31 +50,24 @@ class PostController(BaseController):
         texto: str = form.get('texto')
         autor_id: int = form.get('autor')
 
-        # Nome aleatório para a imagem
-        arquivo_ext: str = imagem.filename.split('.')[-1]
-        novo_nome: str = f"{str(uuid4())}.{arquivo_ext}"
+        # Grava a imagem em blocos, nomeada pelo hash do conteúdo, com limite de tamanho do tipo
+        arquivo: ArquivoSalvo = await salvar_upload(imagem, 'post')
 
         # Instanciar o objeto
-        post: PostModel = PostModel(titulo=titulo, imagem=novo_nome, texto=texto, id_autor=int(autor_id))
+        post: PostModel = PostModel(titulo=titulo, imagem=arquivo.nome, texto=texto, id_autor=int(autor_id))
         
-        # Busca e adiciona as tags
-        for id_tag in tags:
-            tag = await self.get_objeto(model_obj=TagModel, id_obj=int(id_tag))
-            post.tags.append(tag)
-
-        # Fazer o upload do arquivo
-        async with async_open(f"{settings.MEDIA}/post/{novo_nome}", "wb") as afile:
-            await afile.write(imagem.file.read())
-        
-        # Cria a sessão e insere no banco de dados
-        async with get_session() as session:
+        # Insere pela sessão do request (o commit é feito no fim do request)
+        async with self.transacao() as session:
+            # Busca todas as tags de uma vez, na mesma sessão do post
+            post.tags = await self.get_objetos_por_ids(session, TagModel, tags)
             session.add(post)
-            await session.commit()
+            agendar_variantes(session, 'post', arquivo.nome)
+            await self.ajustar_contador(session, TagModel.total_posts, [tag.id for tag in post.tags], 1)
  
 
     async def put_crud(self, obj: object) -> None:
-        async with get_session() as session:
-            post: PostModel = await session.get(self.model, obj.id)
+        async with self.transacao() as session:
+            post: PostModel = await session.get(self.model, obj.id, options=[selectinload(PostModel.tags)])
 
             if post:
                 # Recebe os dados do form
@@ -69,27 +82,28 @@ class PostController(BaseController):
                 if titulo and titulo != post.titulo:
                     post.titulo = titulo
                 if tags:
-                    # Se houver tags, zeramos as presentes no post
-                    post.tags = []
-                    await session.commit()
-                    # Busca e adiciona as tags
-                    for id_tag in tags:
-                        tag = await self.get_objeto(model_obj=TagModel, id_obj=int(id_tag))
-                        # Operação para juntar o objeto tag que vem de outra
-                        # sessão com o objeto post que está nesta sessão.
-                        tag_local = await session.merge(tag)
-                        post.tags.append(tag_local)
+                    # Aplica só as tags removidas e as adicionadas, no mesmo commit
+                    adicionados, removidos = await self.sincronizar_colecao(session, post.tags, TagModel, tags)
+                    await self.ajustar_contador(session, TagModel.total_posts, adicionados, 1)
+                    await self.ajustar_contador(session, TagModel.total_posts, removidos, -1)
                 if texto and texto != post.texto:
                     post.texto = texto
-                if autor_id and autor_id != post.autor.id:
+                if autor_id and int(autor_id) != post.id_autor:
                     post.id_autor = int(autor_id)
                 if imagem.filename:
-                    # Gera um nome aleatório
-                    arquivo_ext: str = imagem.filename.split('.')[-1]
-                    novo_nome: str = f"{str(uuid4())}.{arquivo_ext}"
-                    post.imagem = novo_nome
-                    # Faz o upload da imagem
-                    async with async_open(f"{settings.MEDIA}/post/{novo_nome}", "wb") as afile:
-                        await afile.write(imagem.file.read())
-                await session.commit()
-
+                    # Grava a nova imagem em blocos
+                    arquivo: ArquivoSalvo = await salvar_upload(imagem, 'post')
+                    post.imagem = arquivo.nome
+                    agendar_variantes(session, 'post', arquivo.nome)
+
+
+    async def del_crud(self, id_obj: int) -> Optional[int]:
+        """
+        Desconta o post das suas tags antes do DELETE (as associações saem pelo cascade)
+        """
+        async with self.transacao() as session:
+            tags_do_post = select(tags_post.c.id_tag).where(tags_post.c.id_post == id_obj)
+            query = update(TagModel).where(TagModel.id.in_(tags_do_post)).values(total_posts=TagModel.total_posts - 1)
+            await session.execute(query.execution_options(synchronize_session=False))
+
+        return await super().del_crud(id_obj)
@@ -1,18 +1,24 @@
+from typing import List
+
 from fastapi.requests import Request
 from fastapi import UploadFile
 
-from aiofile import async_open
-
-from uuid import uuid4
-
-from core.configs import settings
-from core.database import get_session
+from core.imagens import agendar_variantes
+from core.uploads import ArquivoSalvo, salvar_uploads
 from models.projeto_model import ProjetoModel
 from controllers.base_controller import BaseController
 
 
 class ProjetoController(BaseController):
 
+    # Listagem do mais novo para o mais antigo
+    colunas_paginacao = ('data', 'id')
+    paginacao_desc = True
+
+    # Detalhes servidos do cache de entidades por até 5 minutos
+    cache_ttl = 300
+    cache_tamanho = 256
+
     def __init__(self, request: Request) -> None:
         super().__init__(request, ProjetoModel)
     
@@ -27,41 +33,21 @@ class ProjetoController(BaseController):
         imagem3: UploadFile = form.get('imagem3')
         descricao_final: str = form.get('descricao_final')
 
-        # Nome aleatório para a imagem1
-        arquivo_ext1: str = imagem1.filename.split('.')[-1]
-        novo_nome1: str = f"{str(uuid4())}.{arquivo_ext1}"
-
-        # Nome aleatório para a imagem2
-        arquivo_ext2: str = imagem2.filename.split('.')[-1]
-        novo_nome2: str = f"{str(uuid4())}.{arquivo_ext2}"
-
-        # Nome aleatório para a imagem3
-        arquivo_ext3: str = imagem3.filename.split('.')[-1]
-        novo_nome3: str = f"{str(uuid4())}.{arquivo_ext3}"
+        # Grava as três imagens ao mesmo tempo, em blocos (nome pelo hash do conteúdo e limite de tamanho)
+        arquivo1, arquivo2, arquivo3 = await salvar_uploads([imagem1, imagem2, imagem3], 'projeto')
 
         # Instanciar o objeto
-        projeto: ProjetoModel = ProjetoModel(titulo=titulo, descricao_inicial=descricao_inicial, imagem1=novo_nome1, imagem2=novo_nome2, imagem3=novo_nome3, descricao_final=descricao_final)
-
-        # Fazer o upload do arquivo1
-        async with async_open(f"{settings.MEDIA}/projeto/{novo_nome1}", "wb") as afile:
-            await afile.write(imagem1.file.read())
+        projeto: ProjetoModel = ProjetoModel(titulo=titulo, descricao_inicial=descricao_inicial, imagem1=arquivo1.nome, imagem2=arquivo2.nome, imagem3=arquivo3.nome, descricao_final=descricao_final)
         
-        # Fazer o upload do arquivo2
-        async with async_open(f"{settings.MEDIA}/projeto/{novo_nome2}", "wb") as afile:
-            await afile.write(imagem2.file.read())
-
-        # Fazer o upload do arquivo3
-        async with async_open(f"{settings.MEDIA}/projeto/{novo_nome3}", "wb") as afile:
-            await afile.write(imagem3.file.read())
-        
-        # Cria a sessão e insere no banco de dados
-        async with get_session() as session:
+        # Insere pela sessão do request (o commit é feito no fim do request)
+        async with self.transacao() as session:
             session.add(projeto)
-            await session.commit()
+            for campo, arquivo in zip(('imagem1', 'imagem2', 'imagem3'), (arquivo1, arquivo2, arquivo3)):
+                agendar_variantes(session, f'projeto.{campo}', arquivo.nome)
  
 
     async def put_crud(self, obj: object) -> None:
-        async with get_session() as session:
+        async with self.transacao() as session:
             projeto: ProjetoModel = await session.get(self.model, obj.id)
 
             if projeto:
@@ -81,35 +67,15 @@ class ProjetoController(BaseController):
                 if descricao_inicial and descricao_inicial != projeto.descricao_inicial:
                     projeto.descricao_inicial = descricao_inicial
 
-                if imagem1.filename:
-                    # Gera um nome aleatório para imagem1
-                    arquivo_ext1: str = imagem1.filename.split('.')[-1]
-                    novo_nome1: str = f"{str(uuid4())}.{arquivo_ext1}"
-                    projeto.imagem1 = novo_nome1
-                    # Faz o upload da imagem
-                    async with async_open(f"{settings.MEDIA}/projeto/{novo_nome1}", "wb") as afile:
-                        await afile.write(imagem1.file.read())
-
-                if imagem2.filename:
-                    # Gera um nome aleatório para imagem2
-                    arquivo_ext2: str = imagem2.filename.split('.')[-1]
-                    novo_nome2: str = f"{str(uuid4())}.{arquivo_ext2}"
-                    projeto.imagem2 = novo_nome2
-                    # Faz o upload da imagem
-                    async with async_open(f"{settings.MEDIA}/projeto/{novo_nome2}", "wb") as afile:
-                        await afile.write(imagem2.file.read())
-
-                if imagem3.filename:
-                    # Gera um nome aleatório para imagem1
-                    arquivo_ext3: str = imagem3.filename.split('.')[-1]
-                    novo_nome3: str = f"{str(uuid4())}.{arquivo_ext3}"
-                    projeto.imagem3 = novo_nome3
-                    # Faz o upload da imagem
-                    async with async_open(f"{settings.MEDIA}/projeto/{novo_nome3}", "wb") as afile:
-                        await afile.write(imagem3.file.read())
+                # Grava ao mesmo tempo só as imagens que foram enviadas
+                campos: List[str] = [campo for campo, imagem in (('imagem1', imagem1), ('imagem2', imagem2), ('imagem3', imagem3)) if imagem.filename]
+                arquivos: List[ArquivoSalvo] = await salvar_uploads([form.get(campo) for campo in campos], 'projeto')
+
+                for campo, arquivo in zip(campos, arquivos):
+                    setattr(projeto, campo, arquivo.nome)
+                    agendar_variantes(session, f'projeto.{campo}', arquivo.nome)
 
                 if descricao_final and descricao_final != projeto.descricao_final:
                     projeto.descricao_final = descricao_final
                     
-                await session.commit()
 
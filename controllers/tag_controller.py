@@ -1,12 +1,24 @@
+from typing import List, NamedTuple
+
 from fastapi.requests import Request
+from sqlalchemy.future import select
 
-from core.database import get_session
 from models.tag_model import TagModel
 from controllers.base_controller import BaseController
 
 
+class TagNuvem(NamedTuple):
+    """Projeção de uma tag com o seu total de posts (nuvem de tags)"""
+    id: int
+    tag: str
+    total_posts: int
+
+
 class TagController(BaseController):
 
+    # ?ordem=uso: tags mais usadas primeiro (índice em total_posts, id)
+    ordenacoes = {'uso': (('total_posts', 'id'), True)}
+
     def __init__(self, request: Request) -> None:
         super().__init__(request, TagModel)
     
@@ -19,14 +31,13 @@ class TagController(BaseController):
         # Instanciar o objeto
         tag_obj: TagModel = TagModel(tag=tag)
         
-        # Cria a sessão e insere no banco de dados
-        async with get_session() as session:
+        # Insere pela sessão do request (o commit é feito no fim do request)
+        async with self.transacao() as session:
             session.add(tag_obj)
-            await session.commit()
  
 
     async def put_crud(self, obj: object) -> None:
-        async with get_session() as session:
+        async with self.transacao() as session:
             tag_obj: TagModel = await session.get(self.model, obj.id)
 
             if tag_obj:
@@ -37,6 +48,18 @@ class TagController(BaseController):
 
                 if tag and tag != tag_obj.tag:
                     tag_obj.tag = tag
-        
-                await session.commit()
 
+
+    async def get_nuvem(self, limite: int = 30) -> List[TagNuvem]:
+        """
+        Retorna as tags mais usadas pelo contador mantido, sem contar as associações
+        (atendida só pelo índice ix_tags_total_posts_id)
+        """
+        query = (
+            select(TagModel.id, TagModel.tag, TagModel.total_posts)
+            .order_by(TagModel.total_posts.desc(), TagModel.id.desc())
+            .limit(limite)
+        )
+        result = await self.session_leitura.execute(query)
+
+        return [TagNuvem(*linha) for linha in result.all()]
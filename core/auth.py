@@ -1,5 +1,9 @@
 import hashlib
-from typing import Optional
+import hmac
+import json
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+from time import time
+from typing import NamedTuple, Optional
 from fastapi import Response
 from fastapi import Request
 
@@ -14,7 +18,93 @@ def try_hex_to_int(valor_hex: str) -> int:
         return int(valor_hex, 16)
     except:
         return 0
-            
+
+
+
+class MembroSessao(NamedTuple):
+    """Dados do membro carregados no token, suficientes para montar o cabeçalho do admin"""
+    id: int
+    nome: str
+    imagem: str
+    versao_token: int = 0
+
+
+def __b64(dados: bytes) -> str:
+    return urlsafe_b64encode(dados).rstrip(b'=').decode('ascii')
+
+
+def __unb64(texto: str) -> bytes:
+    return urlsafe_b64decode(texto + '=' * (-len(texto) % 4))
+
+
+def __assinar(chave_id: str, payload: str) -> str:
+    chave: str = settings.AUTH_CHAVES[chave_id]
+    assinatura = hmac.new(chave.encode('utf-8'), f"{chave_id}.{payload}".encode('utf-8'), hashlib.sha256).digest()
+    return __b64(assinatura)
+
+
+def gerar_token(membro: object) -> str:
+    """
+    Gera o token de sessão assinado: v2.<chave>.<payload>.<assinatura>
+    """
+    agora: float = round(time(), 3)
+    claims: dict = {
+        "id": membro.id,
+        "nome": membro.nome,
+        "img": membro.imagem,
+        "iat": agora,
+        "exp": int(agora) + settings.AUTH_TOKEN_DURACAO,
+        "g": settings.AUTH_GERACAO,
+        # Versão do membro no banco (membros.versao_token): troca de senha a incrementa
+        "vt": membro.versao_token or 0,
+    }
+    payload: str = __b64(json.dumps(claims, separators=(',', ':')).encode('utf-8'))
+    chave_id: str = settings.AUTH_CHAVE_ATUAL
+
+    return f"v2.{chave_id}.{payload}.{__assinar(chave_id, payload)}"
+
+
+def ler_token(valor: str) -> Optional[dict]:
+    """
+    Valida assinatura, expiração e geração do token e retorna as claims ou None.
+    A revogação por membro (claim vt) é conferida contra o banco em core.deps.
+    """
+    partes = valor.split('.')
+    if len(partes) != 4 or partes[0] != 'v2':
+        return None
+
+    _, chave_id, payload, assinatura = partes
+    if chave_id not in settings.AUTH_CHAVES:
+        return None
+    # Em bytes: compare_digest com str levanta TypeError se o cookie tiver caracteres não ASCII
+    if not hmac.compare_digest(assinatura.encode('utf-8'), __assinar(chave_id, payload).encode('utf-8')):
+        print('Alerta: Assinatura de token inválida')
+        return None
+
+    try:
+        claims: dict = json.loads(__unb64(payload))
+    except ValueError:
+        return None
+
+    if claims["exp"] < time() or claims["g"] != settings.AUTH_GERACAO:
+        return None
+
+    return claims
+
+
+def token_vigente(claims: dict, membro: object) -> bool:
+    """
+    Indica se o token não foi revogado: o membro ainda tem a versão gravada nele
+    """
+    return claims.get("vt", 0) == (membro.versao_token or 0)
+
+
+def token_desatualizado(claims: dict, membro: object) -> bool:
+    """
+    Indica se o membro foi alterado depois da emissão do token (nome/imagem antigos)
+    """
+    return claims["nome"] != membro.nome or claims["img"] != membro.imagem
+
 
 def __gerar_hash_cookie(texto:str) -> str:
     """
@@ -24,29 +114,30 @@ def __gerar_hash_cookie(texto:str) -> str:
     return hashlib.sha512(texto.encode('utf-8')).hexdigest()
 
 
-def set_auth(response: Response, membro_id: int) -> None:
+def set_auth(response: Response, membro: object) -> None:
     """
-    Função que adiciona um cookie na response do usuário logado
+    Função que adiciona um cookie com o token assinado na response do usuário logado
     """
-    valor_hash: str = __gerar_hash_cookie(str(membro_id))
-
-    # Gerar o valor hexadecimal do membro_id e pega somente a parte que nos interessa
-    membro_id_hex: str = hex(membro_id)[2:]
+    valor: str = gerar_token(membro)
 
-    # Montar o valor do token
-    valor: str = membro_id_hex + '.' + valor_hash
-
-    response.set_cookie(key=settings.AUTH_COOKIE_NAME, value=valor, httponly=True)
+    response.set_cookie(key=settings.AUTH_COOKIE_NAME, value=valor, httponly=True, max_age=settings.AUTH_TOKEN_DURACAO)
 
 
 def gerar_hash_senha(senha: str) -> str:
     """
     Função que gera e retorna o hash de um texto/senha
     """
-    hash_senha: str = sha512_crypt.hash(senha, rounds=123_456)
+    hash_senha: str = sha512_crypt.hash(senha, rounds=settings.HASH_ROUNDS)
     return hash_senha
 
 
+def precisa_rehash(hash_senha: str) -> bool:
+    """
+    Indica se o hash foi gerado com parâmetros diferentes da política atual
+    """
+    return sha512_crypt.using(rounds=settings.HASH_ROUNDS).needs_update(hash_senha)
+
+
 def verificar_senha(senha: str, hash_senha: str) -> bool:
     """
     Função que verifica se a senha é igual ao hash contido no banco de dados
@@ -56,9 +147,9 @@ def verificar_senha(senha: str, hash_senha: str) -> bool:
 
 def get_membro_id(request: Request) -> Optional[int]:
     """
-    Recupera o membro_id do cookie
+    Recupera o membro_id do cookie no formato antigo (hex(id).sha512)
     """
-    if settings.AUTH_COOKIE_NAME not in request.cookies:
+    if settings.AUTH_COOKIE_NAME not in request.cookies or not settings.AUTH_ACEITA_LEGADO:
         return None
     #Extra o cookie
     valor = request.cookies[settings.AUTH_COOKIE_NAME]
@@ -0,0 +1,78 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Hashable, Optional
+
+
+class CacheTTL:
+    """
+    Cache em memória com expiração (TTL) e descarte do item usado há mais tempo (LRU)
+    """
+
+    def __init__(self, tamanho_max: int, ttl: float) -> None:
+        self.tamanho_max: int = tamanho_max
+        self.ttl: float = ttl
+        self.__itens: OrderedDict = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+        # Cresce a cada invalidação: quem carregou um valor antes dela não deve guardá-lo
+        self.invalidacoes: int = 0
+
+
+    def get(self, chave: Hashable) -> Optional[Any]:
+        """
+        Retorna o valor da chave ou None se não existir ou tiver expirado
+        """
+        item = self.__itens.get(chave)
+
+        if item is None or item[0] < monotonic():
+            if item is not None:
+                del self.__itens[chave]
+            self.misses += 1
+            return None
+
+        self.__itens.move_to_end(chave)
+        self.hits += 1
+        return item[1]
+
+
+    def set(self, chave: Hashable, valor: Any) -> None:
+        """
+        Guarda o valor, descartando o item menos usado se o cache estiver cheio
+        """
+        self.__itens[chave] = (monotonic() + self.ttl, valor)
+        self.__itens.move_to_end(chave)
+
+        while len(self.__itens) > self.tamanho_max:
+            self.__itens.popitem(last=False)
+
+
+    def invalidar(self, chave: Hashable) -> None:
+        """
+        Remove a chave do cache
+        """
+        self.__itens.pop(chave, None)
+        self.invalidacoes += 1
+
+
+    def limpar(self) -> None:
+        """
+        Remove todos os itens do cache
+        """
+        self.__itens.clear()
+        self.invalidacoes += 1
+
+
+    def stats(self) -> dict:
+        """
+        Retorna os contadores de hit/miss para ajuste do tamanho e do TTL
+        """
+        total: int = self.hits + self.misses
+
+        return {
+            "itens": len(self.__itens),
+            "hits": self.hits,
+            "misses": self.misses,
+            "taxa_hit": round(self.hits / total, 3) if total else 0.0,
+            "invalidacoes": self.invalidacoes,
+        }
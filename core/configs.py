@@ -1,3 +1,5 @@
+from typing import Dict, List, Optional
+
 from pydantic import BaseSettings
 from sqlalchemy.ext.declarative import declarative_base
 from fastapi.templating import Jinja2Templates
@@ -12,6 +14,100 @@ class Settings(BaseSettings):
     AUTH_COOKIE_NAME: str = 'guniversity'
     SALTY: str = '7xsIchuzya2gcszhxCY181sT7vaJ_JkCjh6xqxRkpfqfGWI1se6VtKThigQQOjCrWYs1MnIfwOtANlgacfxgLg'
 
+    # Tokens de sessão assinados (HMAC). Para rotacionar, adicione uma nova chave e
+    # aponte AUTH_CHAVE_ATUAL para ela; as antigas continuam validando até saírem do dict.
+    AUTH_CHAVES: Dict[str, str] = {'k1': 'dGeCxUe8p0x1tUrQ2y3m_VhN9aYv7KjZsW4oLbR6cTfHqE5iPgMnA0dSuXwB1lOk'}
+    AUTH_CHAVE_ATUAL: str = 'k1'
+    AUTH_TOKEN_DURACAO: int = 60 * 60 * 8
+    # Incrementar invalida todos os tokens emitidos
+    AUTH_GERACAO: int = 1
+    # Aceita os cookies no formato antigo durante a migração
+    AUTH_ACEITA_LEGADO: bool = True
+
+    # Custo do sha512_crypt; use `python calibrar_hash.py` para escolher o valor do host
+    HASH_ROUNDS: int = 123_456
+    HASH_ALVO_MS: int = 250
+
+    # Pool de processos para hashing de senhas
+    HASH_MAX_WORKERS: int = 2
+    HASH_MAX_CONCORRENCIA: int = 2
+    HASH_MAX_FILA: int = 32
+
+    # Arquivos de media sem referência só são apagados depois desta carência (segundos)
+    MIDIA_GC_CARENCIA: int = 60 * 60 * 24
+    # Registros por transação do migrar_midia.py (layout em subpastas ab/cd/)
+    MIDIA_MIGRACAO_LOTE: int = 200
+
+    # Variantes redimensionadas das imagens enviadas (precisa do Pillow)
+    IMAGEM_MAX_WORKERS: int = 1
+    IMAGEM_DENSIDADES: List[int] = [1, 2]
+    IMAGEM_FORMATOS: List[str] = ['webp', 'jpeg']
+    IMAGEM_QUALIDADE: int = 80
+
+    # Limite de tentativas de login (token bucket): 'memoria' ou 'sqlite' (compartilhado entre workers)
+    LOGIN_LIMITE_BACKEND: str = 'memoria'
+    LOGIN_LIMITE_SQLITE: str = 'limitador_login.sqlite3'
+    LOGIN_LIMITE_IP_CAPACIDADE: int = 20
+    LOGIN_LIMITE_IP_POR_MINUTO: int = 10
+    LOGIN_LIMITE_EMAIL_CAPACIDADE: int = 5
+    LOGIN_LIMITE_EMAIL_POR_MINUTO: int = 2
+    # Máximo de baldes em memória (os menos usados saem primeiro) e intervalo (s) da limpeza do SQLite
+    LOGIN_LIMITE_MAX_BALDES: int = 100_000
+    LOGIN_LIMITE_LIMPEZA: int = 60
+
+    # Paginação das listagens do admin
+    ADMIN_PAGINA_TAMANHO: int = 25
+    ADMIN_PAGINA_MAX: int = 100
+    # Posts mais recentes oferecidos no select de post dos comentários (mais o já escolhido)
+    ADMIN_OPCOES_POSTS: int = 50
+
+    # Cache dos membros autenticados. O TTL limita quanto tempo uma exclusão ou troca de
+    # senha feita em outro worker leva para derrubar as sessões abertas do membro.
+    MEMBRO_CACHE_TAMANHO: int = 256
+    MEMBRO_CACHE_TTL: int = 30
+
+    # Cache-Control por mount: max-age (s) dos arquivos comuns, revalidados pelo ETag (0 = no-cache),
+    # e dos imutáveis (nome com hash do conteúdo ou URL com ?v=<versão>)
+    ESTATICOS_CACHE: Dict[str, Dict[str, int]] = {
+        'static': {'max_age': 60 * 60, 'imutavel': 60 * 60 * 24 * 365},
+        'media': {'max_age': 60 * 60 * 24, 'imutavel': 60 * 60 * 24 * 365},
+    }
+    # Digests (ETags) de arquivos mantidos em memória
+    ESTATICOS_ETAGS: int = 4096
+
+    # Upload de imagens: tamanho do bloco da cópia e limite (bytes) por pasta de media
+    UPLOAD_BLOCO: int = 64 * 1024
+    UPLOAD_LIMITE_PADRAO: int = 5 * 1024 * 1024
+    UPLOAD_LIMITES: Dict[str, int] = {
+        'autor': 2 * 1024 * 1024,
+        'membro': 2 * 1024 * 1024,
+        'post': 5 * 1024 * 1024,
+        'projeto': 8 * 1024 * 1024,
+    }
+
+    # Tabelas de referência (tags, áreas, autores) mantidas em memória para os formulários
+    REFERENCIAS_TTL: int = 300
+
+    # Pool de conexões do banco
+    DB_POOL_TAMANHO: int = 5
+    DB_POOL_EXCEDENTE: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECICLAR: int = 60 * 30
+    DB_POOL_PRE_PING: bool = True
+    # Conexões abertas já no startup (limitado a DB_POOL_TAMANHO)
+    DB_POOL_AQUECER: int = 2
+    # Cache de prepared statements do asyncpg por conexão; use 0 atrás de um pgbouncer em modo transaction
+    DB_CACHE_STATEMENTS: int = 100
+
+    # Réplica de leitura opcional para as consultas do admin. Depois de uma escrita o
+    # navegador lê do primário por DB_REPLICA_JANELA segundos (lê as próprias escritas).
+    DB_REPLICA_URL: Optional[str] = None
+    DB_REPLICA_JANELA: int = 10
+    DB_REPLICA_COOKIE: str = 'guniversity_rw'
+
+    # Conexões retiradas do pool por request; acima disso o request é registrado nas métricas
+    DB_CHECKOUTS_POR_REQUEST: int = 1
+
     class Config:
         case_sensitive = True
 
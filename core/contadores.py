@@ -0,0 +1,43 @@
+from typing import Dict
+
+from sqlalchemy import text
+
+from core.database import engine
+
+
+# Cada comando recalcula um contador inteiro de uma vez e só regrava as linhas que divergem
+REPAROS: Dict[str, str] = {
+    'posts.total_comentarios': '''
+        UPDATE posts p SET total_comentarios = c.total
+        FROM (
+            SELECT p2.id, count(c2.id) AS total
+            FROM posts p2 LEFT JOIN comentarios c2 ON c2.id_post = p2.id
+            GROUP BY p2.id
+        ) c
+        WHERE c.id = p.id AND p.total_comentarios <> c.total
+    ''',
+    'tags.total_posts': '''
+        UPDATE tags t SET total_posts = c.total
+        FROM (
+            SELECT t2.id, count(tp.id_post) AS total
+            FROM tags t2 LEFT JOIN tags_post tp ON tp.id_tag = t2.id
+            GROUP BY t2.id
+        ) c
+        WHERE c.id = t.id AND t.total_posts <> c.total
+    ''',
+}
+
+
+async def reparar_contadores() -> Dict[str, int]:
+    """
+    Recalcula os contadores desnormalizados a partir das tabelas de origem, numa
+    única transação, e retorna quantas linhas de cada um estavam erradas
+    """
+    corrigidos: Dict[str, int] = {}
+
+    async with engine.begin() as conn:
+        for nome, sql in REPAROS.items():
+            result = await conn.execute(text(sql))
+            corrigidos[nome] = result.rowcount
+
+    return corrigidos
@@ -1,33 +1,327 @@
+import asyncio
+from time import perf_counter, time
+from typing import Callable, List, Optional
+
+from fastapi.requests import Request
+from fastapi.responses import Response
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.configs import settings
+from core.metricas import registrar_fonte
 
 
-engine: AsyncEngine = create_async_engine(settings.DB_URL, echo=False)
+class PoolMedido(AsyncAdaptedQueuePool):
+    """Pool de conexões que mede quanto tempo os requests esperam por uma conexão livre"""
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.esperas: int = 0
+        self.espera_total: float = 0.0
+        self.espera_max: float = 0.0
+        self.timeouts: int = 0
 
-def get_session() -> AsyncSession:
-    __async_session = sessionmaker(
+
+    def _do_get(self):
+        inicio: float = perf_counter()
+        try:
+            return super()._do_get()
+        except TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            espera: float = perf_counter() - inicio
+            self.esperas += 1
+            self.espera_total += espera
+            self.espera_max = max(self.espera_max, espera)
+
+
+    def stats(self) -> dict:
+        return {
+            "tamanho": self.size(),
+            "em_uso": self.checkedout(),
+            "livres": self.checkedin(),
+            "excedente": max(self.overflow(), 0),
+            "espera_media_ms": round(self.espera_total / self.esperas * 1000, 2) if self.esperas else 0,
+            "espera_max_ms": round(self.espera_max * 1000, 2),
+            "timeouts": self.timeouts,
+        }
+
+
+def opcoes_engine(url: str) -> dict:
+    """
+    Monta as opções do engine a partir do Settings
+    """
+    opcoes: dict = {
+        "echo": False,
+        "poolclass": PoolMedido,
+        "pool_size": settings.DB_POOL_TAMANHO,
+        "max_overflow": settings.DB_POOL_EXCEDENTE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECICLAR,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+    if make_url(url).get_driver_name() == 'asyncpg':
+        opcoes["connect_args"] = {"prepared_statement_cache_size": settings.DB_CACHE_STATEMENTS}
+
+    return opcoes
+
+
+engine: AsyncEngine = create_async_engine(settings.DB_URL, **opcoes_engine(settings.DB_URL))
+# O pool é recriado pelo engine em alguns casos (dispose); a métrica lê sempre o atual
+registrar_fonte('pool_db', lambda: engine.pool.stats())
+
+# Criada uma única vez; antes um sessionmaker novo era montado a cada sessão
+fabrica_sessao: sessionmaker = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    class_=AsyncSession,
+    bind=engine
+)
+
+# Réplica de leitura, só quando DB_REPLICA_URL estiver configurada
+engine_replica: Optional[AsyncEngine] = None
+fabrica_sessao_replica: Optional[sessionmaker] = None
+
+if settings.DB_REPLICA_URL:
+    engine_replica = create_async_engine(settings.DB_REPLICA_URL, **opcoes_engine(settings.DB_REPLICA_URL))
+    registrar_fonte('pool_db_replica', lambda: engine_replica.pool.stats())
+
+    fabrica_sessao_replica = sessionmaker(
         autocommit=False,
         autoflush=False,
         expire_on_commit=False,
         class_=AsyncSession,
-        bind=engine
+        bind=engine_replica
     )
-    
-    session: AsyncSession = __async_session()
+
+
+def get_session() -> AsyncSession:
+    session: AsyncSession = fabrica_sessao()
+
+    return session
+
+
+class EstatisticasSessao:
+    """Números das sessões por request (unidade de trabalho), expostos em /admin/metricas"""
+
+    def __init__(self) -> None:
+        self.requests: int = 0
+        self.commits: int = 0
+        self.rollbacks: int = 0
+        self.checkouts: int = 0
+        self.checkouts_max: int = 0
+        self.acima_do_limite: int = 0
+        # Último request acima do limite, para achar a rota nas métricas sem poluir o log
+        self.ultimo_acima_do_limite: Optional[str] = None
+        self.leituras_replica: int = 0
+
+
+    def registrar(self, request: Request, checkouts: int, confirmada: bool) -> None:
+        self.requests += 1
+        self.checkouts += checkouts
+        self.checkouts_max = max(self.checkouts_max, checkouts)
+
+        if confirmada:
+            self.commits += 1
+        else:
+            self.rollbacks += 1
+
+        if checkouts > settings.DB_CHECKOUTS_POR_REQUEST:
+            self.acima_do_limite += 1
+            self.ultimo_acima_do_limite = f'{request.method} {request.url.path} ({checkouts})'
+
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "commits": self.commits,
+            "rollbacks": self.rollbacks,
+            "checkouts": self.checkouts,
+            "checkouts_por_request": round(self.checkouts / self.requests, 2) if self.requests else 0,
+            "checkouts_max": self.checkouts_max,
+            "acima_do_limite": self.acima_do_limite,
+            "ultimo_acima_do_limite": self.ultimo_acima_do_limite,
+            "leituras_replica": self.leituras_replica,
+        }
+
+
+estatisticas_sessao: EstatisticasSessao = EstatisticasSessao()
+registrar_fonte('sessao_request', estatisticas_sessao.stats)
+
+
+def nova_sessao_request(fabrica: sessionmaker) -> AsyncSession:
+    session: AsyncSession = fabrica()
+    session.info['checkouts'] = 0
+    session.info['escreveu'] = False
+    session.info['apos_commit'] = []
+
+    # Cada transação iniciada na sessão é uma conexão retirada do pool
+    @event.listens_for(session.sync_session, 'after_begin')
+    def contar_checkout(sync_session, transaction, connection) -> None:
+        sync_session.info['checkouts'] += 1
+
+    @event.listens_for(session.sync_session, 'after_flush')
+    def marcar_escrita(sync_session, flush_context) -> None:
+        sync_session.info['escreveu'] = True
+
+    return session
+
+
+def get_sessao_request(request: Request) -> AsyncSession:
+    """
+    Retorna a sessão do request, criada no primeiro uso e compartilhada por todos os
+    controllers até o fim do request
+    """
+    session: Optional[AsyncSession] = getattr(request.state, 'sessao', None)
+
+    if session is None:
+        session = nova_sessao_request(fabrica_sessao)
+        request.state.sessao = session
+
+    return session
+
+
+def get_sessao_leitura_request(request: Request) -> AsyncSession:
+    """
+    Retorna a sessão para consultas somente leitura: a da réplica, se configurada.
+    Fica no primário quando o próprio request já escreveu ou dentro da janela
+    de leitura das próprias escritas.
+    """
+    if fabrica_sessao_replica is None:
+        return get_sessao_request(request)
+
+    if request_escreveu(request):
+        return get_sessao_request(request)
+
+    if em_janela_escrita(request):
+        return get_sessao_request(request)
+
+    session: Optional[AsyncSession] = getattr(request.state, 'sessao_replica', None)
+
+    if session is None:
+        session = nova_sessao_request(fabrica_sessao_replica)
+        request.state.sessao_replica = session
 
     return session
 
 
-async def create_tables() -> None:
-    import models.__all_models
-    print('Criando as tabelas no banco de dados')
-    async with engine.begin() as conn:
-        await conn.run_sync(settings.DBBaseModel.metadata.drop_all)
-        await conn.run_sync(settings.DBBaseModel.metadata.create_all)
-    print('Tabelas criadas com sucesso')
+def request_escreveu(request: Request) -> bool:
+    """
+    True se o request já enviou escritas ao banco (ainda não confirmadas)
+    """
+    session: Optional[AsyncSession] = getattr(request.state, 'sessao', None)
+
+    return session is not None and session.info['escreveu']
+
+
+def em_janela_escrita(request: Request) -> bool:
+    valor: Optional[str] = request.cookies.get(settings.DB_REPLICA_COOKIE)
+
+    try:
+        return valor is not None and float(valor) > time()
+    except ValueError:
+        return False
+
+
+def abrir_janela_escrita(response: Response) -> None:
+    """
+    Depois de uma escrita, faz o navegador ler do primário por DB_REPLICA_JANELA segundos,
+    tempo para a réplica alcançar (o redirect para a listagem já mostra o que foi salvo)
+    """
+    if fabrica_sessao_replica is None:
+        return
+
+    response.set_cookie(
+        key=settings.DB_REPLICA_COOKIE,
+        value=f"{time() + settings.DB_REPLICA_JANELA:.0f}",
+        max_age=settings.DB_REPLICA_JANELA,
+        httponly=True,
+        samesite='lax'
+    )
+
+
+def apos_commit(session: AsyncSession, funcao: Callable[[], None]) -> None:
+    """
+    Agenda uma função para rodar só depois que a sessão do request for confirmada
+    (invalidação de cache, revogação de tokens...)
+    """
+    session.info.setdefault('apos_commit', []).append(funcao)
+
+
+async def finalizar_sessao_request(request: Request, confirmar: bool) -> bool:
+    """
+    Confirma ou desfaz a sessão do request, uma única vez, e devolve as conexões ao pool.
+    Retorna True se alguma escrita foi confirmada.
+    """
+    replica: Optional[AsyncSession] = getattr(request.state, 'sessao_replica', None)
+
+    if replica is not None:
+        # Só houve leitura na réplica, não há o que confirmar
+        await replica.close()
+        request.state.sessao_replica = None
+        estatisticas_sessao.leituras_replica += 1
+
+    session: Optional[AsyncSession] = getattr(request.state, 'sessao', None)
+
+    if session is None:
+        return False
+
+    confirmada: bool = False
+    try:
+        if confirmar:
+            await session.commit()
+            confirmada = True
+        else:
+            await session.rollback()
+    finally:
+        await session.close()
+        request.state.sessao = None
+        estatisticas_sessao.registrar(request, checkouts=session.info['checkouts'], confirmada=confirmada)
+
+    if confirmada:
+        funcoes: List[Callable[[], None]] = session.info['apos_commit']
+        for funcao in funcoes:
+            funcao()
+
+    return confirmada and session.info['escreveu']
+
+
+async def aquecer_pool() -> None:
+    """
+    Abre as primeiras conexões do pool no startup, para que os primeiros requests
+    depois de um deploy não paguem o custo de conectar
+    """
+    quantidade: int = min(settings.DB_POOL_AQUECER, settings.DB_POOL_TAMANHO)
+    if quantidade < 1:
+        return
+
+    for engine_pool in [engine, engine_replica]:
+        if engine_pool is None:
+            continue
+
+        try:
+            conexoes = await asyncio.gather(*[engine_pool.connect() for _ in range(quantidade)])
+            for conexao in conexoes:
+                await conexao.close()
+            print(f'Pool de {engine_pool.url.host or engine_pool.url.database} aquecido com {quantidade} conexões')
+        except Exception as err:
+            print(f'Não foi possível aquecer o pool: {err}')
+
+
+async def fechar_pool() -> None:
+    """
+    Fecha as conexões do pool no shutdown (os requests em andamento já terminaram)
+    """
+    await engine.dispose()
 
+    if engine_replica is not None:
+        await engine_replica.dispose()
@@ -1,19 +1,75 @@
 from typing import Optional
 from datetime import datetime
 from fastapi.requests import Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from controllers.membro_controller import MembroController
-from models.membro_model import MembroModel
-from core.auth import get_membro_id
+from core.auth import MembroSessao, get_membro_id, ler_token, token_desatualizado, token_vigente
+from core.configs import settings
+from core.database import get_sessao_request
 
-async def valida_login(request: Request) -> Optional[MembroModel]:
+
+class LoginNecessarioError(Exception):
+    """Lançada quando uma rota do /admin é acessada sem um membro autenticado"""
+
+
+async def get_sessao(request: Request) -> AsyncSession:
+    """
+    Dependência com a sessão do request, a mesma usada pelos controllers
+    (o commit ou rollback fica a cargo do middleware, no fim do request)
+    """
+    return get_sessao_request(request)
+
+
+async def get_membro_logado(request: Request) -> Optional[MembroSessao]:
     """
-    Valida o login do membro através do cooki de autenticação
+    Resolve o membro do cookie de autenticação uma única vez por request
+    e guarda o resultado em request.state.membro
     """
-    context = {"request": request, "ano": datetime.now().year}
-    membro_id: int = get_membro_id(request=request)
+    if hasattr(request.state, 'membro'):
+        return request.state.membro
+
+    membro: Optional[MembroSessao] = None
+    valor: Optional[str] = request.cookies.get(settings.AUTH_COOKIE_NAME)
+    membro_id: Optional[int] = None
+    claims: Optional[dict] = None
+
+    if valor and valor.startswith('v2.'):
+        claims = ler_token(valor)
+        if claims:
+            membro_id = claims["id"]
+    elif valor:
+        # Cookie no formato antigo, aceito durante a migração
+        membro_id = get_membro_id(request=request)
 
     if membro_id and membro_id > 0:
+        # Vem do cache de membros (TTL curto): exclusões e trocas de senha feitas em
+        # outro worker derrubam o token em até MEMBRO_CACHE_TTL segundos
         membro_controller: MembroController = MembroController(request)
-        membro = await membro_controller.get_one_crud(id_obj=membro_id)
-        context.update({"membro": membro})
-    return context        
\ No newline at end of file
+        membro_model = await membro_controller.get_membro_autenticado(membro_id=membro_id)
+
+        if membro_model and (claims is None or token_vigente(claims, membro_model)):
+            membro = MembroSessao(id=membro_model.id, nome=membro_model.nome, imagem=membro_model.imagem,
+                                  versao_token=membro_model.versao_token or 0)
+
+            if claims is None or token_desatualizado(claims, membro_model):
+                # O cookie é reemitido no formato atual ao final do request
+                request.state.renovar_auth = membro
+
+    request.state.membro = membro
+    return membro
+
+
+async def valida_login(request: Request) -> None:
+    """
+    Dependência do router /admin: barra requests sem membro autenticado
+    antes de qualquer handler ser executado
+    """
+    if not await get_membro_logado(request):
+        raise LoginNecessarioError()
+
+
+def get_contexto(request: Request) -> dict:
+    """
+    Monta o context básico dos templates com o membro já resolvido no request
+    """
+    return {"request": request, "ano": datetime.now().year, "membro": getattr(request.state, 'membro', None)}
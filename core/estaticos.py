@@ -0,0 +1,195 @@
+import os
+import re
+import stat
+from functools import lru_cache
+from hashlib import sha256
+from typing import Dict, List, Optional
+
+from fastapi.staticfiles import StaticFiles
+from jinja2 import pass_context
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+
+from core.configs import settings
+from core.metricas import registrar_fonte
+
+
+# Nomes que nunca mudam de conteúdo: sha256 do conteúdo, uuid4 dos uploads antigos
+# ou impressão digital no nome (app.3f2a9c1e.css)
+NOME_IMUTAVEL = re.compile(
+    r'^([0-9a-f]{64}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})\.\w+$'
+    r'|\.[0-9a-f]{8,}\.\w+$'
+)
+NOME_SHA256 = re.compile(r'^(?P<hash>[0-9a-f]{64})\.\w+$')
+
+# Tamanho da impressão digital usada em ?v= pelo estatico()
+VERSAO_TAMANHO: int = 12
+
+# Manifesto de static/: caminho relativo -> versão (?v=), montado na subida da aplicação
+MANIFESTO: Dict[str, str] = {}
+
+
+@lru_cache(maxsize=settings.ESTATICOS_ETAGS)
+def digest_arquivo(caminho: str, mtime_ns: int, tamanho: int) -> str:
+    """
+    sha256 do conteúdo do arquivo. A data e o tamanho entram na chave do cache:
+    se o arquivo mudar, o digest é recalculado.
+    """
+    resumo = sha256()
+
+    with open(caminho, 'rb') as arquivo:
+        while bloco := arquivo.read(settings.UPLOAD_BLOCO):
+            resumo.update(bloco)
+
+    return resumo.hexdigest()
+
+
+def digest(caminho: str, stat_result: os.stat_result) -> str:
+    """
+    Digest do conteúdo; arquivos nomeados pelo próprio sha256 não precisam ser lidos
+    """
+    nome_sha256 = NOME_SHA256.match(os.path.basename(caminho))
+    if nome_sha256:
+        return nome_sha256['hash']
+
+    return digest_arquivo(caminho, stat_result.st_mtime_ns, stat_result.st_size)
+
+
+class ArquivosEstaticos(StaticFiles):
+    """
+    StaticFiles com Cache-Control pela política do mount (settings.ESTATICOS_CACHE), ETag forte
+    (sha256 do conteúdo) e 304 para If-None-Match / If-Modified-Since. Arquivos imutáveis
+    (nome com hash ou URL com ?v=<versão atual>) recebem `immutable` e max-age longo.
+    """
+
+    def __init__(self, *, politica: str, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.politica: str = politica
+
+        # Estatísticas
+        self.respostas: int = 0
+        self.nao_modificados: int = 0
+        self.imutaveis: int = 0
+
+        registrar_fonte(f'estaticos_{politica}', self.stats)
+
+
+    def lookup_path(self, path: str):
+        full_path, stat_result = super().lookup_path(path)
+
+        # lookup_path roda numa thread: calcula aqui o digest que o file_response vai usar
+        if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
+            digest(full_path, stat_result)
+
+        return full_path, stat_result
+
+
+    def cache_control(self, imutavel: bool) -> str:
+        max_age: int = settings.ESTATICOS_CACHE[self.politica]['max_age']
+        max_age_imutavel: int = settings.ESTATICOS_CACHE[self.politica]['imutavel']
+
+        if imutavel and max_age_imutavel:
+            return f'public, max-age={max_age_imutavel}, immutable'
+        if max_age:
+            return f'public, max-age={max_age}'
+
+        # Sem max-age o navegador revalida sempre (e recebe 304 se não mudou)
+        return 'no-cache'
+
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        etag: str = digest(str(full_path), stat_result)
+
+        versao: Optional[str] = QueryParams(scope.get('query_string', b'')).get('v')
+        imutavel: bool = bool(NOME_IMUTAVEL.search(os.path.basename(full_path))) or versao == etag[:VERSAO_TAMANHO]
+
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, method=scope['method'],
+                                headers={'etag': f'"{etag}"', 'cache-control': self.cache_control(imutavel)})
+
+        self.respostas += 1
+        self.imutaveis += imutavel
+
+        if self.is_not_modified(response.headers, request_headers):
+            self.nao_modificados += 1
+            return NotModifiedResponse(response.headers)
+
+        return response
+
+
+    def is_not_modified(self, response_headers: Headers, request_headers: Headers) -> bool:
+        """
+        If-None-Match (lista de ETags, W/ ou *) tem precedência; If-Modified-Since só vale sem ele
+        """
+        if_none_match: Optional[str] = request_headers.get('if-none-match')
+
+        if if_none_match is None:
+            return super().is_not_modified(response_headers, request_headers)
+
+        etiquetas: List[str] = [etiqueta.strip() for etiqueta in if_none_match.split(',')]
+        etiquetas = [etiqueta[2:] if etiqueta.startswith('W/') else etiqueta for etiqueta in etiquetas]
+
+        return '*' in etiquetas or response_headers['etag'] in etiquetas
+
+
+    def stats(self) -> dict:
+        return {
+            "respostas": self.respostas,
+            "nao_modificados": self.nao_modificados,
+            "imutaveis": self.imutaveis,
+        }
+
+
+def stats_digests() -> dict:
+    info = digest_arquivo.cache_info()
+
+    return {"em_memoria": info.currsize, "calculados": info.misses, "reutilizados": info.hits, "manifesto": len(MANIFESTO)}
+
+
+registrar_fonte('estaticos_digests', stats_digests)
+
+
+def carregar_manifesto(diretorio: str = 'static') -> int:
+    """
+    Calcula a versão de cada arquivo de static/ e monta o MANIFESTO. Lê todos os arquivos:
+    roda uma vez, numa thread, no startup. Arquivos alterados sem reiniciar a aplicação
+    continuam com a versão antiga no ?v= e deixam de ser servidos como imutáveis
+    (o file_response compara com o digest atual). Retorna quantos arquivos entraram.
+    """
+    manifesto: Dict[str, str] = {}
+
+    for raiz, _, nomes in os.walk(diretorio):
+        for nome in nomes:
+            # realpath, como o lookup_path: o digest calculado aqui já serve de ETag
+            caminho: str = os.path.realpath(os.path.join(raiz, nome))
+            try:
+                stat_result: os.stat_result = os.stat(caminho)
+            except OSError:
+                continue
+
+            relativo: str = os.path.relpath(os.path.join(raiz, nome), diretorio).replace(os.sep, '/')
+            manifesto[relativo] = digest(caminho, stat_result)[:VERSAO_TAMANHO]
+
+    MANIFESTO.clear()
+    MANIFESTO.update(manifesto)
+
+    return len(manifesto)
+
+
+# Helper dos templates
+
+@pass_context
+def estatico(contexto, path: str) -> str:
+    """
+    {{ estatico('admin/css/sb-admin-2.min.css') }}: URL de /static com ?v=<digest do conteúdo>,
+    servida como imutável enquanto o arquivo não mudar. Só consulta o MANIFESTO (nenhum acesso
+    a disco durante a renderização); arquivos fora dele saem sem ?v=.
+    """
+    url: str = contexto['request'].url_for('static', path=path)
+    versao: Optional[str] = MANIFESTO.get(path.lstrip('/'))
+
+    return f'{url}?v={versao}' if versao else url
+
+
+settings.TEMPLATES.env.globals.update(estatico=estatico)
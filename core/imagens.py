@@ -0,0 +1,260 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter
+from typing import Dict, List, Optional, Set, Tuple
+
+from jinja2 import pass_context
+from markupsafe import Markup, escape
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.configs import settings
+from core.database import apos_commit
+from core.metricas import registrar_fonte
+from core.midia import caminho_midia, indice_referencias, pasta_do_campo
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow é opcional: sem ele as imagens são servidas como foram enviadas
+    Image = None
+
+
+# Tamanho de exibição (largura, altura) de cada campo de imagem, o mesmo anotado nos models.
+# A chave é a pasta em media/ ou 'pasta.coluna' quando o model tem mais de uma imagem.
+TAMANHOS: Dict[str, Tuple[int, int]] = {
+    'autor': (40, 40),
+    'membro': (150, 150),
+    'post': (900, 400),
+    'projeto.imagem1': (1300, 700),
+    'projeto.imagem2': (600, 400),
+    'projeto.imagem3': (600, 400),
+}
+
+EXTENSOES: Dict[str, str] = {'webp': 'webp', 'jpeg': 'jpg'}
+
+
+def nome_variante(nome: str, tamanho: Tuple[int, int], densidade: int, formato: str) -> str:
+    """
+    Nome do arquivo derivado: <nome sem extensão>_<largura>x<altura>@<densidade>x.<ext>
+    """
+    largura, altura = tamanho
+    return f"{nome.rsplit('.', 1)[0]}_{largura}x{altura}@{densidade}x.{EXTENSOES[formato]}"
+
+
+def gerar_derivadas_arquivo(origem: str, tamanho: Tuple[int, int], densidades: List[int],
+                            formatos: List[str], qualidade: int) -> int:
+    """
+    Recorta e redimensiona a imagem para o tamanho de exibição em cada densidade e a grava
+    em cada formato (roda no pool de processos). Não amplia a imagem além de 1x.
+    Retorna quantos arquivos foram gerados.
+    """
+    gerados: int = 0
+    caminho: Path = Path(origem)
+
+    with Image.open(caminho) as original:
+        imagem = ImageOps.exif_transpose(original)
+
+        for densidade in densidades:
+            alvo: Tuple[int, int] = (tamanho[0] * densidade, tamanho[1] * densidade)
+            if densidade > 1 and (imagem.width < alvo[0] or imagem.height < alvo[1]):
+                continue
+
+            derivada = ImageOps.fit(imagem, alvo, Image.LANCZOS)
+
+            for formato in formatos:
+                destino: Path = caminho.with_name(nome_variante(caminho.name, tamanho, densidade, formato))
+                temporario: Path = destino.with_name(f".{destino.name}.tmp")
+
+                if formato == 'jpeg':
+                    derivada.convert('RGB').save(temporario, 'JPEG', quality=qualidade, optimize=True, progressive=True)
+                else:
+                    derivada.save(temporario, 'WEBP', quality=qualidade, method=6)
+
+                os.replace(temporario, destino)
+                gerados += 1
+
+    return gerados
+
+
+class ServicoImagens:
+    """
+    Gera as variantes redimensionadas das imagens enviadas em um pool de processos,
+    em segundo plano, depois do commit do request que as gravou
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers: int = max_workers
+
+        self.__pool: Optional[ProcessPoolExecutor] = None
+        self.__tarefas: Set[asyncio.Task] = set()
+
+        # Estatísticas
+        self.arquivos: int = 0
+        self.variantes: int = 0
+        self.falhas: int = 0
+        self.latencia_total: float = 0.0
+
+
+    @property
+    def ativo(self) -> bool:
+        return Image is not None
+
+
+    def agendar(self, campo: str, nome: str) -> None:
+        """
+        Agenda a geração das variantes de media/<pasta>/<nome> sem esperar por ela
+        """
+        if not self.ativo or campo not in TAMANHOS:
+            return
+
+        # Conteúdo repetido (mesmo nome): as variantes já existem
+        if caminho_midia(pasta_do_campo(campo), nome_variante(nome, TAMANHOS[campo], 1, settings.IMAGEM_FORMATOS[0])).exists():
+            return
+
+        tarefa: asyncio.Task = asyncio.get_running_loop().create_task(self.gerar(campo, nome))
+        self.__tarefas.add(tarefa)
+        tarefa.add_done_callback(self.__tarefas.discard)
+
+
+    async def gerar(self, campo: str, nome: str) -> int:
+        """
+        Gera as variantes de uma imagem e retorna quantas foram gravadas (0 se falhar)
+        """
+        if self.__pool is None:
+            self.__pool = ProcessPoolExecutor(max_workers=self.max_workers)
+
+        origem: Path = caminho_midia(pasta_do_campo(campo), nome)
+        inicio: float = perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            gerados: int = await loop.run_in_executor(self.__pool, gerar_derivadas_arquivo, str(origem), TAMANHOS[campo],
+                                                      settings.IMAGEM_DENSIDADES, settings.IMAGEM_FORMATOS, settings.IMAGEM_QUALIDADE)
+        except Exception as err:
+            # Sem variantes a imagem original continua sendo servida
+            self.falhas += 1
+            print(f'Falha ao gerar as variantes de {origem}: {err}')
+            return 0
+        finally:
+            self.latencia_total += perf_counter() - inicio
+
+        self.arquivos += 1
+        self.variantes += gerados
+        return gerados
+
+
+    def stats(self) -> dict:
+        processados: int = self.arquivos + self.falhas
+
+        return {
+            "ativo": self.ativo,
+            "pendentes": len(self.__tarefas),
+            "arquivos": self.arquivos,
+            "variantes": self.variantes,
+            "falhas": self.falhas,
+            "latencia_media_ms": round(self.latencia_total / processados * 1000, 2) if processados else 0.0,
+        }
+
+
+    async def encerrar(self) -> None:
+        """
+        Espera as gerações em andamento e encerra o pool de processos (shutdown da aplicação)
+        """
+        if self.__tarefas:
+            await asyncio.gather(*self.__tarefas, return_exceptions=True)
+
+        if self.__pool:
+            self.__pool.shutdown(wait=True)
+            self.__pool = None
+
+
+servico_imagens: ServicoImagens = ServicoImagens(max_workers=settings.IMAGEM_MAX_WORKERS)
+registrar_fonte('imagens', servico_imagens.stats)
+
+
+def agendar_variantes(session: AsyncSession, campo: str, nome: str) -> None:
+    """
+    Gera as variantes da imagem recém-enviada assim que o request for confirmado
+    """
+    apos_commit(session, lambda: servico_imagens.agendar(campo, nome))
+
+
+async def gerar_pendentes(refazer: bool = False) -> int:
+    """
+    Gera as variantes das imagens já cadastradas que ainda não as têm (ou de todas, com refazer).
+    Retorna quantas imagens foram processadas.
+    """
+    pendentes: List[Tuple[str, str]] = []
+
+    for campo, nomes in (await indice_referencias()).items():
+        pasta: str = pasta_do_campo(campo)
+
+        for nome in nomes:
+            if not caminho_midia(pasta, nome).exists():
+                continue
+            if refazer or not caminho_midia(pasta, nome_variante(nome, TAMANHOS[campo], 1, settings.IMAGEM_FORMATOS[0])).exists():
+                pendentes.append((campo, nome))
+
+    # O pool de processos limita quantas rodam ao mesmo tempo
+    await asyncio.gather(*(servico_imagens.gerar(campo, nome) for campo, nome in pendentes))
+
+    return len(pendentes)
+
+
+# Helpers dos templates
+
+def midia_url(request, campo: str, nome: str) -> str:
+    """
+    URL de um arquivo de media/. Nomes antigos (sem subpasta) são resolvidos pelo MidiaStaticFiles.
+    """
+    return request.url_for('media', path=f'{pasta_do_campo(campo)}/{nome}')
+
+
+def variante_url(request, campo: str, nome: str, formato: str = 'webp', densidade: int = 1) -> str:
+    """
+    URL da variante do campo no formato e densidade pedidos, ou da imagem original
+    enquanto a variante não existir (Pillow ausente ou geração ainda em andamento)
+    """
+    if campo in TAMANHOS:
+        arquivo: str = nome_variante(nome, TAMANHOS[campo], densidade, formato)
+        if caminho_midia(pasta_do_campo(campo), arquivo).exists():
+            return midia_url(request, campo, arquivo)
+
+    return midia_url(request, campo, nome)
+
+
+@pass_context
+def midia(contexto, campo: str, nome: str) -> str:
+    """
+    {{ midia('post', objeto.imagem) }}: URL da imagem original
+    """
+    return midia_url(contexto['request'], campo, nome)
+
+
+@pass_context
+def variante(contexto, campo: str, nome: str, formato: str = 'webp', densidade: int = 1) -> str:
+    """
+    {{ variante('post', objeto.imagem) }}: URL de uma variante para usar direto no src
+    """
+    return variante_url(contexto['request'], campo, nome, formato, densidade)
+
+
+@pass_context
+def imagem_responsiva(contexto, campo: str, nome: str, alt: str = '', classe: str = '') -> Markup:
+    """
+    <picture> com as variantes webp (1x/2x) e o jpeg como fallback, no tamanho de exibição do campo
+    """
+    request = contexto['request']
+    largura, altura = TAMANHOS.get(campo, (None, None))
+
+    srcset: str = ', '.join(f"{variante_url(request, campo, nome, 'webp', densidade)} {densidade}x" for densidade in settings.IMAGEM_DENSIDADES)
+    dimensoes: str = f' width="{largura}" height="{altura}"' if largura else ''
+
+    return Markup(
+        f'<picture><source type="image/webp" srcset="{escape(srcset)}">'
+        f'<img src="{escape(variante_url(request, campo, nome, "jpeg"))}" alt="{escape(alt)}" class="{escape(classe)}"'
+        f'{dimensoes} loading="lazy" decoding="async"></picture>'
+    )
+
+
+settings.TEMPLATES.env.globals.update(midia=midia, variante=variante, imagem_responsiva=imagem_responsiva)
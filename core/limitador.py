@@ -0,0 +1,171 @@
+import sqlite3
+from collections import OrderedDict
+from time import time
+from typing import Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from core.configs import settings
+from core.metricas import registrar_fonte
+
+
+class BackendLimitador:
+    """
+    Armazena os baldes de tokens. Implementações precisam consumir de forma atômica.
+    """
+
+    async def consumir(self, chave: str, capacidade: float, por_segundo: float) -> bool:
+        raise NotImplementedError("Você precisa implementar este método.")
+
+
+class BackendMemoria(BackendLimitador):
+    """
+    Baldes no próprio processo (cada worker tem os seus), em ordem de uso (LRU).
+    Baldes que já encheram de novo são descartados (equivalem a um balde novo) e,
+    acima de LOGIN_LIMITE_MAX_BALDES, sai o usado há mais tempo.
+    """
+
+    def __init__(self, max_baldes: int) -> None:
+        self.max_baldes: int = max_baldes
+        # chave -> (tokens, último consumo, quando volta a ficar cheio)
+        self.__baldes: OrderedDict = OrderedDict()
+        self.descartados: int = 0
+
+
+    async def consumir(self, chave: str, capacidade: float, por_segundo: float) -> bool:
+        agora: float = time()
+        tokens, ultimo, _ = self.__baldes.get(chave, (capacidade, agora, agora))
+        tokens = min(capacidade, tokens + (agora - ultimo) * por_segundo)
+
+        permitido: bool = tokens >= 1
+        if permitido:
+            tokens -= 1
+
+        self.__baldes[chave] = (tokens, agora, agora + (capacidade - tokens) / por_segundo)
+        self.__baldes.move_to_end(chave)
+        self.__podar(agora)
+
+        return permitido
+
+
+    def __podar(self, agora: float) -> None:
+        # Os mais antigos ficam no início: para no primeiro que ainda não encheu (custo amortizado O(1))
+        while self.__baldes:
+            _, (_, _, cheio_em) = next(iter(self.__baldes.items()))
+            if cheio_em > agora:
+                break
+            self.__baldes.popitem(last=False)
+
+        while len(self.__baldes) > self.max_baldes:
+            self.__baldes.popitem(last=False)
+            self.descartados += 1
+
+
+class BackendSqlite(BackendLimitador):
+    """
+    Baldes em um arquivo SQLite local, compartilhados entre os workers do mesmo host
+    (faz o papel de um Redis sem exigir mais um serviço)
+    """
+
+    def __init__(self, caminho: str, intervalo_limpeza: float) -> None:
+        self.caminho: str = caminho
+        self.intervalo_limpeza: float = intervalo_limpeza
+        self.__ultima_limpeza: float = 0.0
+
+        conn = self.__conectar()
+        try:
+            conn.execute('CREATE TABLE IF NOT EXISTS baldes (chave TEXT PRIMARY KEY, tokens REAL, ultimo REAL, cheio_em REAL)')
+            # Arquivos criados antes da coluna cheio_em
+            colunas = [linha[1] for linha in conn.execute('PRAGMA table_info(baldes)')]
+            if 'cheio_em' not in colunas:
+                conn.execute('ALTER TABLE baldes ADD COLUMN cheio_em REAL')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_baldes_cheio_em ON baldes (cheio_em)')
+        finally:
+            conn.close()
+
+
+    def __conectar(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.caminho, timeout=5, isolation_level=None)
+
+
+    def __consumir(self, chave: str, capacidade: float, por_segundo: float) -> bool:
+        conn = self.__conectar()
+        try:
+            # BEGIN IMMEDIATE trava a escrita: leitura e atualização do balde ficam atômicas entre processos
+            conn.execute('BEGIN IMMEDIATE')
+            agora: float = time()
+            linha = conn.execute('SELECT tokens, ultimo FROM baldes WHERE chave = ?', (chave,)).fetchone()
+            tokens, ultimo = linha if linha else (capacidade, agora)
+            tokens = min(capacidade, tokens + (agora - ultimo) * por_segundo)
+
+            permitido: bool = tokens >= 1
+            if permitido:
+                tokens -= 1
+
+            conn.execute('INSERT OR REPLACE INTO baldes (chave, tokens, ultimo, cheio_em) VALUES (?, ?, ?, ?)',
+                         (chave, tokens, agora, agora + (capacidade - tokens) / por_segundo))
+
+            # De tempos em tempos remove os baldes que já encheram de novo (equivalem a não existir)
+            if agora - self.__ultima_limpeza > self.intervalo_limpeza:
+                conn.execute('DELETE FROM baldes WHERE cheio_em <= ? OR cheio_em IS NULL', (agora,))
+                self.__ultima_limpeza = agora
+
+            conn.execute('COMMIT')
+            return permitido
+        finally:
+            conn.close()
+
+
+    async def consumir(self, chave: str, capacidade: float, por_segundo: float) -> bool:
+        return await run_in_threadpool(self.__consumir, chave, capacidade, por_segundo)
+
+
+class LimitadorLogin:
+    """
+    Token bucket por IP e por email para as tentativas de login, verificado antes de
+    qualquer consulta ou hash de senha
+    """
+
+    def __init__(self, backend: BackendLimitador) -> None:
+        self.backend: BackendLimitador = backend
+        self.rejeitados_ip: int = 0
+        self.rejeitados_email: int = 0
+
+
+    async def permitir(self, ip: str, email: str) -> bool:
+        """
+        Consome um token do IP e um do email; retorna False se algum estiver sem saldo
+        """
+        if not await self.backend.consumir(f"ip:{ip}", settings.LOGIN_LIMITE_IP_CAPACIDADE, settings.LOGIN_LIMITE_IP_POR_MINUTO / 60):
+            self.rejeitados_ip += 1
+            return False
+
+        email = (email or '').strip().lower()
+        if not await self.backend.consumir(f"email:{email}", settings.LOGIN_LIMITE_EMAIL_CAPACIDADE, settings.LOGIN_LIMITE_EMAIL_POR_MINUTO / 60):
+            self.rejeitados_email += 1
+            return False
+
+        return True
+
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "baldes_descartados": getattr(self.backend, 'descartados', 0),
+            "rejeitados_ip": self.rejeitados_ip,
+            "rejeitados_email": self.rejeitados_email,
+            "rejeitados": self.rejeitados_ip + self.rejeitados_email,
+        }
+
+
+def criar_backend() -> BackendLimitador:
+    """
+    Cria o backend configurado em settings.LOGIN_LIMITE_BACKEND
+    """
+    if settings.LOGIN_LIMITE_BACKEND == 'sqlite':
+        return BackendSqlite(settings.LOGIN_LIMITE_SQLITE, intervalo_limpeza=settings.LOGIN_LIMITE_LIMPEZA)
+    return BackendMemoria(max_baldes=settings.LOGIN_LIMITE_MAX_BALDES)
+
+
+limitador_login: LimitadorLogin = LimitadorLogin(criar_backend())
+registrar_fonte('limitador_login', limitador_login.stats)
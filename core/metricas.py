@@ -0,0 +1,19 @@
+from typing import Callable, Dict
+
+
+# Cada fonte é uma função sem argumentos que devolve um dicionário com os seus números
+_fontes: Dict[str, Callable[[], dict]] = {}
+
+
+def registrar_fonte(nome: str, fonte: Callable[[], dict]) -> None:
+    """
+    Registra uma fonte de métricas que será exposta em /admin/metricas
+    """
+    _fontes[nome] = fonte
+
+
+def coletar_metricas() -> Dict[str, dict]:
+    """
+    Retorna um retrato atual de todas as fontes de métricas registradas
+    """
+    return {nome: fonte() for nome, fonte in _fontes.items()}
@@ -0,0 +1,322 @@
+import os
+import re
+from contextlib import contextmanager
+from hashlib import sha256
+from pathlib import Path
+from time import time
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import text
+
+from core.configs import settings
+from core.database import engine
+from core.estaticos import ArquivosEstaticos
+
+
+# Tabela e coluna de cada campo de imagem. A chave é a pasta em media/
+# ou 'pasta.coluna' quando o model tem mais de uma imagem.
+COLUNAS: Dict[str, Tuple[str, str]] = {
+    'autor': ('autores', 'imagem'),
+    'membro': ('membros', 'imagem'),
+    'post': ('posts', 'imagem'),
+    'projeto.imagem1': ('projetos', 'imagem1'),
+    'projeto.imagem2': ('projetos', 'imagem2'),
+    'projeto.imagem3': ('projetos', 'imagem3'),
+}
+
+# Variantes geradas a partir de um original: <base>_<largura>x<altura>@<densidade>x.<ext>
+VARIANTE = re.compile(r'^(?P<base>.+)_\d+x\d+@\d+x\.\w+$')
+
+# Nomes que já começam por um hash (sha256 do conteúdo ou uuid4) usam o próprio prefixo
+PREFIXO_HEX = re.compile(r'^[0-9a-f]{4}')
+
+
+class Orfao(NamedTuple):
+    """Arquivo em media/ que nenhum registro usa"""
+    caminho: Path
+    tamanho: int
+    pasta: str
+    relativo: str
+
+
+def pasta_do_campo(campo: str) -> str:
+    return campo.split('.')[0]
+
+
+def fragmento(nome: str) -> str:
+    """
+    Subpastas 'ab/cd' do arquivo, tiradas do início do hash do nome. As variantes
+    ficam na mesma subpasta do original.
+    """
+    variante = VARIANTE.match(nome)
+    base: str = (variante['base'] if variante else nome.rsplit('.', 1)[0]).lower()
+
+    if not PREFIXO_HEX.match(base):
+        base = sha256(base.encode()).hexdigest()
+
+    return f'{base[:2]}/{base[2:4]}'
+
+
+def nome_fragmentado(nome: str) -> str:
+    """
+    Nome gravado no banco: 'ab/cd/<nome>'. Nomes que já têm subpasta voltam como estão.
+    """
+    if '/' in nome:
+        return nome
+
+    return f'{fragmento(nome)}/{nome}'
+
+
+def caminho_midia(pasta: str, nome: str) -> Path:
+    """
+    Caminho em disco de um arquivo de media/<pasta>/. Nomes antigos, sem subpasta, podem
+    estar na pasta plana ou já ter sido movidos pelo migrar_midia.py.
+    """
+    caminho: Path = Path(settings.MEDIA) / pasta / nome
+
+    if '/' not in nome and not caminho.exists():
+        fragmentado: Path = Path(settings.MEDIA) / pasta / nome_fragmentado(nome)
+        if fragmentado.exists():
+            return fragmentado
+
+    return caminho
+
+
+def caminho_alternativo(path: str) -> Optional[str]:
+    """
+    Para uma URL de /media que não existe em disco, o outro layout do mesmo arquivo:
+    'post/<nome>' <-> 'post/ab/cd/<nome>'
+    """
+    partes: List[str] = path.strip('/').split('/')
+
+    if len(partes) == 2:
+        return f'{partes[0]}/{nome_fragmentado(partes[1])}'
+    if len(partes) == 4:
+        return f'{partes[0]}/{partes[3]}'
+
+    return None
+
+
+class MidiaStaticFiles(ArquivosEstaticos):
+    """
+    StaticFiles de /media que também procura o arquivo no outro layout (plano ou em
+    subpastas), para as URLs antigas continuarem valendo durante e depois da migração
+    """
+
+    def lookup_path(self, path: str):
+        full_path, stat_result = super().lookup_path(path)
+
+        if stat_result is None:
+            alternativo: Optional[str] = caminho_alternativo(path)
+            if alternativo:
+                return super().lookup_path(alternativo)
+
+        return full_path, stat_result
+
+
+async def indice_referencias() -> Dict[str, Set[str]]:
+    """
+    Retorna {campo: nomes de arquivo usados}, lido das colunas de imagem de todos os models
+    """
+    indice: Dict[str, Set[str]] = {}
+
+    async with engine.connect() as conn:
+        for campo, (tabela, coluna) in COLUNAS.items():
+            result = await conn.execute(text(f'SELECT DISTINCT {coluna} FROM {tabela} WHERE {coluna} IS NOT NULL'))
+            indice[campo] = set(result.scalars().all())
+
+    return indice
+
+
+def usados_por_pasta(indice: Dict[str, Set[str]]) -> Dict[str, Set[str]]:
+    """
+    Nomes relativos mantidos em cada pasta de media. Um nome vale nos dois layouts:
+    o migrar_midia.py move o arquivo antes de regravar o registro.
+    """
+    usados: Dict[str, Set[str]] = {}
+
+    for campo, nomes in indice.items():
+        mantidos: Set[str] = usados.setdefault(pasta_do_campo(campo), set())
+        mantidos.update(nome_fragmentado(nome) for nome in nomes)
+        mantidos.update(nome.rsplit('/', 1)[-1] for nome in nomes)
+
+    return usados
+
+
+def mantido(relativo: str, mantidos: Set[str], bases: Set[str]) -> bool:
+    """
+    Indica se o arquivo é um dos mantidos ou variante de um deles
+    """
+    if relativo in mantidos:
+        return True
+
+    variante = VARIANTE.match(relativo)
+    return bool(variante and variante['base'] in bases)
+
+
+def bases_dos_nomes(nomes: Iterable[str]) -> Set[str]:
+    return {nome.rsplit('.', 1)[0] for nome in nomes}
+
+
+def listar_orfaos(indice: Dict[str, Set[str]], carencia: float) -> List[Orfao]:
+    """
+    Lista os arquivos das pastas de media (e subpastas) que não são referenciados pelo índice
+    nem são variantes de um original mantido. Arquivos alterados há menos de `carencia` segundos
+    ficam de fora: podem ser de um upload cujo registro ainda não foi confirmado.
+    """
+    limite: float = time() - carencia
+    orfaos: List[Orfao] = []
+
+    for pasta, nomes in usados_por_pasta(indice).items():
+        diretorio: Path = Path(settings.MEDIA) / pasta
+        if not diretorio.is_dir():
+            continue
+
+        # Nomes relativos à pasta ('<nome>' ou 'ab/cd/<nome>'), como gravados no banco
+        arquivos = [(arquivo.relative_to(diretorio).as_posix(), arquivo, arquivo.stat())
+                    for arquivo in diretorio.rglob('*') if arquivo.is_file()]
+        mantidos: Set[str] = nomes | {relativo for relativo, _, info in arquivos if info.st_mtime > limite}
+        bases: Set[str] = bases_dos_nomes(mantidos)
+
+        for relativo, arquivo, info in arquivos:
+            if not mantido(relativo, mantidos, bases):
+                orfaos.append(Orfao(caminho=arquivo, tamanho=info.st_size, pasta=pasta, relativo=relativo))
+
+    return orfaos
+
+
+def apagar_orfaos(orfaos: List[Orfao], indice: Dict[str, Set[str]], carencia: float) -> List[Orfao]:
+    """
+    Apaga os órfãos listados que continuam órfãos, conferindo de novo logo antes de apagar:
+    o índice (lido outra vez pelo chamador) e a data do arquivo, que o publicar() renova
+    quando um upload novo reaproveita o conteúdo. O arquivo é primeiro renomeado para fora
+    do nome publicado; se a data ainda for antiga, nenhum upload pode mais renová-la
+    (o utime do publicar() falha e ele grava o arquivo de novo). Retorna os apagados.
+    """
+    usados: Dict[str, Set[str]] = usados_por_pasta(indice)
+    bases: Dict[str, Set[str]] = {pasta: bases_dos_nomes(nomes) for pasta, nomes in usados.items()}
+    apagados: List[Orfao] = []
+
+    for orfao in orfaos:
+        if mantido(orfao.relativo, usados.get(orfao.pasta, set()), bases.get(orfao.pasta, set())):
+            continue
+
+        quarentena: Path = orfao.caminho.with_name(f'.{orfao.caminho.name}.apagando')
+        try:
+            os.rename(orfao.caminho, quarentena)
+        except FileNotFoundError:
+            continue
+
+        if quarentena.stat().st_mtime > time() - carencia:
+            # Reaproveitado por um upload depois da listagem: volta ao nome publicado
+            os.replace(quarentena, orfao.caminho)
+            continue
+
+        quarentena.unlink()
+        apagados.append(orfao)
+
+    return apagados
+
+
+def marca_migracao() -> Path:
+    """
+    Arquivo que existe enquanto o migrar_midia.py roda (o GC não roda junto)
+    """
+    return Path(settings.MEDIA) / '.migracao_em_andamento'
+
+
+@contextmanager
+def migrando() -> Iterator[None]:
+    """
+    Marca a migração de layout como em andamento durante o bloco
+    """
+    marca: Path = marca_migracao()
+    marca.write_text(str(os.getpid()))
+    try:
+        yield
+    finally:
+        marca.unlink(missing_ok=True)
+
+
+def recuperar_membros_na_raiz(indice: Dict[str, Set[str]]) -> int:
+    """
+    Move para media/membro/ as imagens de membros que a edição antiga gravava na raiz de media/.
+    Retorna quantas foram movidas.
+    """
+    movidos: int = 0
+
+    for nome in indice.get('membro', set()):
+        if '/' in nome:
+            continue
+
+        origem: Path = Path(settings.MEDIA) / nome
+        destino: Path = Path(settings.MEDIA) / 'membro' / nome
+
+        if origem.is_file() and not destino.exists():
+            origem.replace(destino)
+            movidos += 1
+
+    return movidos
+
+
+def mover_para_fragmento(pasta: str, nome: str) -> int:
+    """
+    Move media/<pasta>/<nome> e as suas variantes para a subpasta do fragmento.
+    Se o destino já existe (mesmo conteúdo em outro registro), só remove a cópia plana.
+    Retorna quantos arquivos foram movidos.
+    """
+    diretorio: Path = Path(settings.MEDIA) / pasta
+    destino: Path = diretorio / fragmento(nome)
+    base: str = nome.rsplit('.', 1)[0]
+
+    arquivos: List[Path] = [diretorio / nome]
+    arquivos += [variante for variante in diretorio.glob(f'{base}_*')
+                 if (encontrada := VARIANTE.match(variante.name)) and encontrada['base'] == base]
+
+    movidos: int = 0
+    for arquivo in arquivos:
+        if not arquivo.is_file():
+            continue
+
+        destino.mkdir(parents=True, exist_ok=True)
+        if (destino / arquivo.name).exists():
+            arquivo.unlink()
+        else:
+            arquivo.replace(destino / arquivo.name)
+            movidos += 1
+
+    return movidos
+
+
+async def migrar_campo(campo: str, lote: int) -> Tuple[int, int]:
+    """
+    Passa as imagens de um campo para o layout em subpastas, `lote` registros por transação.
+    Cada arquivo é movido antes de o registro ser regravado; no intervalo a URL antiga é
+    resolvida pelo MidiaStaticFiles. Retorna (registros regravados, arquivos movidos).
+    """
+    tabela, coluna = COLUNAS[campo]
+    pasta: str = pasta_do_campo(campo)
+
+    consulta = text(f"SELECT id, {coluna} FROM {tabela} WHERE id > :ultimo AND {coluna} IS NOT NULL "
+                    f"AND {coluna} NOT LIKE '%/%' ORDER BY id LIMIT :lote")
+    # Só regrava se o registro não recebeu outra imagem enquanto isso
+    atualizacao = text(f'UPDATE {tabela} SET {coluna} = :novo WHERE id = :id AND {coluna} = :nome')
+
+    registros: int = 0
+    movidos: int = 0
+    ultimo: int = 0
+
+    while True:
+        async with engine.begin() as conn:
+            linhas = (await conn.execute(consulta, {'ultimo': ultimo, 'lote': lote})).all()
+            if not linhas:
+                break
+
+            for id, nome in linhas:
+                movidos += mover_para_fragmento(pasta, nome)
+                result = await conn.execute(atualizacao, {'novo': nome_fragmentado(nome), 'id': id, 'nome': nome})
+                registros += result.rowcount
+
+            ultimo = linhas[-1].id
+
+    return registros, movidos
@@ -0,0 +1,193 @@
+import importlib
+import pkgutil
+from types import ModuleType
+from typing import List, NamedTuple, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+import migracoes
+from core.database import engine
+
+
+# Chave do advisory lock: dois workers subindo juntos não aplicam a mesma migração
+CHAVE_LOCK: int = 14082022
+
+
+class Migracao(NamedTuple):
+    versao: int
+    nome: str
+    descricao: str
+    modulo: ModuleType
+
+
+def listar_migracoes() -> List[Migracao]:
+    """
+    Retorna as migrações do pacote migracoes, ordenadas pela versão
+    """
+    lista: List[Migracao] = []
+
+    for info in pkgutil.iter_modules(migracoes.__path__):
+        if not info.name.startswith('m'):
+            continue
+
+        modulo: ModuleType = importlib.import_module(f'migracoes.{info.name}')
+        lista.append(Migracao(versao=int(info.name[1:5]), nome=info.name, descricao=modulo.DESCRICAO, modulo=modulo))
+
+    lista.sort(key=lambda migracao: migracao.versao)
+
+    versoes = [migracao.versao for migracao in lista]
+    if len(versoes) != len(set(versoes)):
+        raise RuntimeError('Existem duas migrações com o mesmo número de versão')
+
+    return lista
+
+
+async def __versoes_aplicadas(conn: AsyncConnection) -> Set[int]:
+    result = await conn.execute(text('SELECT versao FROM schema_versao'))
+    return {linha[0] for linha in result.all()}
+
+
+async def __criar_tabela_versao() -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            'CREATE TABLE IF NOT EXISTS schema_versao ('
+            'versao INTEGER PRIMARY KEY, '
+            'descricao VARCHAR(200), '
+            'aplicada_em TIMESTAMP WITHOUT TIME ZONE DEFAULT now())'
+        ))
+
+
+async def migrar(alvo: Optional[int] = None) -> List[Migracao]:
+    """
+    Aplica as migrações pendentes (até a versão alvo, se informada), cada uma em
+    sua própria transação, e retorna as que foram aplicadas. Migrações com
+    TRANSACAO = False (ex: CREATE INDEX CONCURRENTLY) rodam em autocommit.
+    """
+    await __criar_tabela_versao()
+    aplicadas: List[Migracao] = []
+
+    for migracao in listar_migracoes():
+        if alvo is not None and migracao.versao > alvo:
+            break
+
+        if getattr(migracao.modulo, 'TRANSACAO', True):
+            aplicada: bool = await __aplicar_em_transacao(migracao)
+        else:
+            aplicada = await __aplicar_em_autocommit(migracao)
+
+        if aplicada:
+            aplicadas.append(migracao)
+
+    return aplicadas
+
+
+async def __registrar(conn: AsyncConnection, migracao: Migracao) -> None:
+    print(f'Aplicando {migracao.nome}: {migracao.descricao}')
+    await migracao.modulo.aplicar(conn)
+    await conn.execute(
+        text('INSERT INTO schema_versao (versao, descricao) VALUES (:versao, :descricao)'),
+        {"versao": migracao.versao, "descricao": migracao.descricao}
+    )
+
+
+async def __aplicar_em_transacao(migracao: Migracao) -> bool:
+    async with engine.begin() as conn:
+        await conn.execute(text('SELECT pg_advisory_xact_lock(:chave)'), {"chave": CHAVE_LOCK})
+
+        if migracao.versao in await __versoes_aplicadas(conn):
+            return False
+
+        await __registrar(conn, migracao)
+
+    return True
+
+
+async def __aplicar_em_autocommit(migracao: Migracao) -> bool:
+    """
+    Cada comando é confirmado sozinho: a migração precisa ser idempotente (IF NOT EXISTS),
+    porque uma falha no meio deixa os comandos anteriores aplicados e ela roda de novo
+    """
+    async with engine.connect() as conexao:
+        conn: AsyncConnection = await conexao.execution_options(isolation_level='AUTOCOMMIT')
+        await conn.execute(text('SELECT pg_advisory_lock(:chave)'), {"chave": CHAVE_LOCK})
+
+        try:
+            if migracao.versao in await __versoes_aplicadas(conn):
+                return False
+
+            await __registrar(conn, migracao)
+        finally:
+            await conn.execute(text('SELECT pg_advisory_unlock(:chave)'), {"chave": CHAVE_LOCK})
+
+    return True
+
+
+async def criar_indice_concorrente(conn: AsyncConnection, nome: str, definicao: str, unico: bool = False) -> None:
+    """
+    CREATE INDEX CONCURRENTLY (sem bloquear escritas na tabela durante a construção), numa
+    migração com TRANSACAO = False. Um CONCURRENTLY interrompido deixa o índice inválido
+    com o mesmo nome, que o IF NOT EXISTS ignoraria: ele é removido antes.
+    """
+    result = await conn.execute(text(
+        'SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+        'WHERE c.relname = :nome AND NOT i.indisvalid'
+    ), {"nome": nome})
+    if result.first() is not None:
+        await conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS {nome}'))
+
+    await conn.execute(text(f'CREATE {"UNIQUE " if unico else ""}INDEX CONCURRENTLY IF NOT EXISTS {nome} ON {definicao}'))
+
+
+async def situacao() -> List[tuple]:
+    """
+    Retorna (versão, nome, aplicada) de cada migração conhecida
+    """
+    await __criar_tabela_versao()
+
+    async with engine.connect() as conn:
+        feitas: Set[int] = await __versoes_aplicadas(conn)
+
+    return [(migracao.versao, migracao.nome, migracao.versao in feitas) for migracao in listar_migracoes()]
+
+
+# Consultas quentes da aplicação. Os parâmetros só precisam ter o tipo certo.
+CONSULTAS_QUENTES = [
+    ('login', 'SELECT * FROM membros WHERE email = :email', {"email": 'x'}),
+    ('comentarios do post', 'SELECT * FROM comentarios WHERE id_post = :id AND (data, id) < (now(), 0) ORDER BY data DESC, id DESC LIMIT 26', {"id": 1}),
+    ('posts mais comentados', 'SELECT * FROM posts ORDER BY total_comentarios DESC, id DESC LIMIT 26', {}),
+    ('nuvem de tags', 'SELECT id, tag, total_posts FROM tags ORDER BY total_posts DESC, id DESC LIMIT 30', {}),
+    ('posts do autor', 'SELECT * FROM posts WHERE id_autor = :id', {"id": 1}),
+    ('duvidas da area', 'SELECT * FROM duvida WHERE id_area = :id', {"id": 1}),
+    ('tags do post', 'SELECT * FROM tags_post WHERE id_post = :id', {"id": 1}),
+    ('posts da tag', 'SELECT * FROM tags_post WHERE id_tag = :id', {"id": 1}),
+    ('tags do autor', 'SELECT * FROM tags_autor WHERE id_autor = :id', {"id": 1}),
+    ('autores da tag', 'SELECT * FROM tags_autor WHERE id_tag = :id', {"id": 1}),
+    ('lista de posts', 'SELECT * FROM posts WHERE (data, id) < (now(), 0) ORDER BY data DESC, id DESC LIMIT 26', {}),
+    ('lista de comentarios', 'SELECT * FROM comentarios WHERE (data, id) < (now(), 0) ORDER BY data DESC, id DESC LIMIT 26', {}),
+    ('lista de projetos', 'SELECT * FROM projetos WHERE (data, id) < (now(), 0) ORDER BY data DESC, id DESC LIMIT 26', {}),
+]
+
+
+async def verificar_planos() -> List[str]:
+    """
+    Roda EXPLAIN nas consultas quentes e retorna as que fariam Seq Scan.
+    Com enable_seqscan desligado o planejador só escolhe Seq Scan quando não há
+    índice que sirva, então tabelas pequenas se comportam como tabelas grandes.
+    """
+    falhas: List[str] = []
+
+    async with engine.connect() as conn:
+        async with conn.begin() as transacao:
+            await conn.execute(text('SET LOCAL enable_seqscan = off'))
+
+            for nome, sql, parametros in CONSULTAS_QUENTES:
+                result = await conn.execute(text(f'EXPLAIN {sql}'), parametros)
+                plano: str = '\n'.join(linha[0] for linha in result.all())
+
+                if 'Seq Scan' in plano:
+                    falhas.append(f'{nome}:\n{plano}')
+
+            await transacao.rollback()
+
+    return falhas
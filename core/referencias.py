@@ -0,0 +1,71 @@
+from time import monotonic
+from typing import Awaitable, Callable, Dict, Tuple
+
+from core.configs import settings
+from core.metricas import registrar_fonte
+
+
+class RegistroReferencias:
+    """
+    Retratos imutáveis (tuplas) de tabelas pequenas e pouco alteradas (tags, áreas, autores),
+    mantidos em memória. Cada retrato é recarregado depois do TTL ou na primeira leitura
+    depois de uma invalidação.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl: float = ttl
+        self.__retratos: Dict[str, Tuple[float, tuple]] = {}
+        self.__geracoes: Dict[str, int] = {}
+
+        self.da_memoria: Dict[str, int] = {}
+        self.consultados: Dict[str, int] = {}
+        self.invalidacoes: Dict[str, int] = {}
+
+
+    async def obter(self, nome: str, carregar: Callable[[], Awaitable[tuple]]) -> tuple:
+        """
+        Retorna o retrato da tabela `nome`, consultando o banco com `carregar` só se
+        ele não existir ou tiver expirado
+        """
+        item = self.__retratos.get(nome)
+
+        if item is not None and item[0] > monotonic():
+            self.da_memoria[nome] = self.da_memoria.get(nome, 0) + 1
+            return item[1]
+
+        geracao: int = self.__geracoes.get(nome, 0)
+        retrato: tuple = tuple(await carregar())
+        self.consultados[nome] = self.consultados.get(nome, 0) + 1
+
+        # Se a tabela foi invalidada durante a consulta, o resultado pode estar velho: usa, mas não guarda
+        if self.__geracoes.get(nome, 0) == geracao:
+            self.__retratos[nome] = (monotonic() + self.ttl, retrato)
+
+        return retrato
+
+
+    def invalidar(self, nome: str) -> None:
+        """
+        Descarta o retrato da tabela; a próxima leitura consulta o banco
+        """
+        self.__geracoes[nome] = self.__geracoes.get(nome, 0) + 1
+        self.__retratos.pop(nome, None)
+        self.invalidacoes[nome] = self.invalidacoes.get(nome, 0) + 1
+
+
+    def stats(self) -> dict:
+        nomes = sorted({*self.da_memoria, *self.consultados, *self.invalidacoes})
+
+        return {
+            nome: {
+                "em_memoria": nome in self.__retratos,
+                "da_memoria": self.da_memoria.get(nome, 0),
+                "consultados": self.consultados.get(nome, 0),
+                "invalidacoes": self.invalidacoes.get(nome, 0),
+            }
+            for nome in nomes
+        }
+
+
+referencias: RegistroReferencias = RegistroReferencias(ttl=settings.REFERENCIAS_TTL)
+registrar_fonte('referencias', referencias.stats)
@@ -0,0 +1,111 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from typing import Optional
+
+from core.auth import gerar_hash_senha, verificar_senha
+from core.configs import settings
+from core.metricas import registrar_fonte
+
+
+class FilaHashCheiaError(Exception):
+    """Lançada quando a fila de hashing de senhas atingiu o limite configurado"""
+
+
+class ServicoHash:
+    """
+    Executa o hashing e a verificação de senhas (sha512_crypt) em um pool de processos,
+    para que o event loop continue atendendo as demais rotas durante um login.
+    """
+
+    def __init__(self, max_workers: int, max_concorrencia: int, max_fila: int) -> None:
+        self.max_workers: int = max_workers
+        self.max_concorrencia: int = max_concorrencia
+        self.max_fila: int = max_fila
+
+        self.__pool: Optional[ProcessPoolExecutor] = None
+        self.__semaforo: Optional[asyncio.Semaphore] = None
+
+        # Estatísticas
+        self.na_fila: int = 0
+        self.em_execucao: int = 0
+        self.total: int = 0
+        self.rejeitados: int = 0
+        self.latencia_total: float = 0.0
+        self.latencia_max: float = 0.0
+
+
+    async def gerar_hash(self, senha: str) -> str:
+        """
+        Gera o hash da senha fora do event loop
+        """
+        return await self.__executar(gerar_hash_senha, senha)
+
+
+    async def verificar(self, senha: str, hash_senha: str) -> bool:
+        """
+        Verifica a senha contra o hash fora do event loop
+        """
+        return await self.__executar(verificar_senha, senha, hash_senha)
+
+
+    def stats(self) -> dict:
+        """
+        Retorna a profundidade da fila e as latências de hashing
+        """
+        return {
+            "na_fila": self.na_fila,
+            "em_execucao": self.em_execucao,
+            "total": self.total,
+            "rejeitados": self.rejeitados,
+            "latencia_media_ms": round(self.latencia_total / self.total * 1000, 2) if self.total else 0.0,
+            "latencia_max_ms": round(self.latencia_max * 1000, 2),
+        }
+
+
+    def encerrar(self) -> None:
+        """
+        Encerra o pool de processos (chamado no shutdown da aplicação)
+        """
+        if self.__pool:
+            self.__pool.shutdown(wait=True)
+            self.__pool = None
+
+
+    async def __executar(self, funcao, *args):
+        if self.__pool is None:
+            self.__pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            self.__semaforo = asyncio.Semaphore(self.max_concorrencia)
+
+        # Recusa de imediato se já houver gente demais esperando
+        if self.na_fila >= self.max_fila:
+            self.rejeitados += 1
+            raise FilaHashCheiaError('Fila de hashing de senhas cheia')
+
+        self.na_fila += 1
+        try:
+            await self.__semaforo.acquire()
+        finally:
+            self.na_fila -= 1
+
+        self.em_execucao += 1
+        inicio: float = perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.__pool, funcao, *args)
+        finally:
+            duracao: float = perf_counter() - inicio
+            self.em_execucao -= 1
+            self.total += 1
+            self.latencia_total += duracao
+            self.latencia_max = max(self.latencia_max, duracao)
+            self.__semaforo.release()
+
+
+servico_hash: ServicoHash = ServicoHash(
+    max_workers=settings.HASH_MAX_WORKERS,
+    max_concorrencia=settings.HASH_MAX_CONCORRENCIA,
+    max_fila=settings.HASH_MAX_FILA
+)
+
+registrar_fonte('hash_senha', servico_hash.stats)
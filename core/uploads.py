@@ -0,0 +1,132 @@
+import asyncio
+import os
+from hashlib import sha256
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+from uuid import uuid4
+
+from aiofile import async_open
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from core.configs import settings
+from core.midia import nome_fragmentado
+
+
+# Formatos de imagem aceitos: assinatura no início do arquivo -> extensão gravada.
+# A extensão vem do conteúdo, nunca do nome enviado pelo cliente (.html, .svg, "../x").
+ASSINATURAS = [
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+]
+
+
+def extensao_imagem(inicio: bytes) -> Optional[str]:
+    """
+    Retorna a extensão do formato identificado pelos primeiros bytes do arquivo ou None
+    """
+    if inicio[:4] == b'RIFF' and inicio[8:12] == b'WEBP':
+        return 'webp'
+
+    for assinatura, extensao in ASSINATURAS:
+        if inicio.startswith(assinatura):
+            return extensao
+
+    return None
+
+
+class ArquivoSalvo(NamedTuple):
+    """Resultado de um upload gravado em media/<pasta>/"""
+    nome: str
+    tamanho: int
+    sha256: str
+    novo: bool
+
+
+def limite_upload(pasta: str) -> int:
+    """
+    Retorna o tamanho máximo, em bytes, das imagens da pasta (tipo de entidade)
+    """
+    return settings.UPLOAD_LIMITES.get(pasta, settings.UPLOAD_LIMITE_PADRAO)
+
+
+def publicar(temporario: Path, destino: Path) -> bool:
+    """
+    Dá o nome final ao arquivo temporário. Se o mesmo conteúdo já existe, descarta a cópia
+    e renova a data do existente (para o GC não apagá-lo). Retorna True se o arquivo é novo.
+    """
+    if destino.exists():
+        try:
+            os.utime(destino)
+        except FileNotFoundError:
+            # O GC apagou (ou tirou do nome publicado) o arquivo depois do exists(): grava a cópia
+            pass
+        else:
+            temporario.unlink()
+            return False
+
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(temporario, destino)
+    return True
+
+
+async def salvar_upload(arquivo: UploadFile, pasta: str) -> ArquivoSalvo:
+    """
+    Grava o upload em media/<pasta>/ab/cd/ em blocos de UPLOAD_BLOCO bytes, sem carregar o
+    arquivo inteiro em memória. O nome é o sha256 do conteúdo, calculado durante a cópia: o mesmo
+    arquivo enviado duas vezes é gravado uma só. O conteúdo vai para um arquivo temporário
+    e só recebe o nome final (rename atômico) depois de completo.
+    Levanta ValueError se o arquivo passar do limite da pasta ou não for JPEG, PNG, GIF ou WebP.
+    """
+    limite: int = limite_upload(pasta)
+
+    arquivo_ext: Optional[str] = None
+    diretorio: Path = Path(settings.MEDIA) / pasta
+    temporario: Path = diretorio / f".{str(uuid4())}.tmp"
+
+    resumo = sha256()
+    tamanho: int = 0
+
+    # UploadFile.read lê o arquivo em disco numa thread, fora do event loop
+    await arquivo.seek(0)
+    try:
+        async with async_open(temporario, "wb") as afile:
+            while bloco := await arquivo.read(settings.UPLOAD_BLOCO):
+                if arquivo_ext is None:
+                    arquivo_ext = extensao_imagem(bloco)
+                    if arquivo_ext is None:
+                        raise ValueError(f'O arquivo {arquivo.filename} não é uma imagem JPEG, PNG, GIF ou WebP')
+
+                tamanho += len(bloco)
+                if tamanho > limite:
+                    raise ValueError(f'A imagem {arquivo.filename} passa do limite de {limite // 1024 // 1024} MB')
+
+                resumo.update(bloco)
+                await afile.write(bloco)
+
+        if arquivo_ext is None:
+            raise ValueError(f'O arquivo {arquivo.filename} está vazio')
+
+        novo_nome: str = nome_fragmentado(f"{resumo.hexdigest()}.{arquivo_ext}")
+        novo: bool = await run_in_threadpool(publicar, temporario, diretorio / novo_nome)
+    except BaseException:
+        temporario.unlink(missing_ok=True)
+        raise
+
+    return ArquivoSalvo(nome=novo_nome, tamanho=tamanho, sha256=resumo.hexdigest(), novo=novo)
+
+
+async def salvar_uploads(arquivos: List[UploadFile], pasta: str) -> List[ArquivoSalvo]:
+    """
+    Grava vários uploads ao mesmo tempo. Se algum falhar, espera os outros terminarem e
+    levanta o primeiro erro (os já gravados podem ser de outros registros e ficam para o GC).
+    """
+    resultados = await asyncio.gather(*(salvar_upload(arquivo, pasta) for arquivo in arquivos), return_exceptions=True)
+    erros: List[BaseException] = [r for r in resultados if isinstance(r, BaseException)]
+
+    if erros:
+        raise erros[0]
+
+    return resultados
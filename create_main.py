@@ -1,9 +1,9 @@
-from core.database import create_tables
+from core.migrador import migrar
 
 
 
 if __name__ == '__main__':
     import asyncio
 
-    asyncio.run(create_tables())
+    asyncio.run(migrar())
 
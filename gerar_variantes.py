@@ -0,0 +1,27 @@
+import sys
+
+from core.database import fechar_pool
+from core.imagens import gerar_pendentes, servico_imagens
+
+
+async def main(refazer: bool) -> None:
+    if not servico_imagens.ativo:
+        print('Pillow não está instalado: as imagens continuam sendo servidas como foram enviadas.')
+        return
+
+    try:
+        processadas: int = await gerar_pendentes(refazer=refazer)
+    finally:
+        await servico_imagens.encerrar()
+        await fechar_pool()
+
+    stats: dict = servico_imagens.stats()
+    print(f'{processadas} imagem(ns) processada(s), {stats["variantes"]} variante(s) gerada(s), {stats["falhas"]} falha(s)')
+
+
+
+if __name__ == '__main__':
+    import asyncio
+
+    # python gerar_variantes.py [--refazer]
+    asyncio.run(main(refazer='--refazer' in sys.argv[1:]))
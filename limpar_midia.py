@@ -0,0 +1,45 @@
+import sys
+
+from core.configs import settings
+from core.database import fechar_pool
+from core.midia import apagar_orfaos, indice_referencias, listar_orfaos, marca_migracao, recuperar_membros_na_raiz
+
+
+async def main(apagar: bool) -> None:
+    if marca_migracao().exists():
+        print(f'Migração de layout em andamento ({marca_migracao()}); rode a limpeza quando ela terminar.')
+        print('Se nenhum migrar_midia.py estiver rodando, apague a marca e tente de novo.')
+        return
+
+    try:
+        indice = await indice_referencias()
+
+        movidos: int = recuperar_membros_na_raiz(indice)
+        if movidos:
+            print(f'{movidos} imagem(ns) de membro movida(s) da raiz de media/ para media/membro/')
+
+        orfaos = listar_orfaos(indice, carencia=settings.MIDIA_GC_CARENCIA)
+        for orfao in orfaos:
+            print(f'Órfão: {orfao.caminho}')
+
+        if apagar and orfaos:
+            # A listagem pode levar minutos: registros confirmados nesse meio tempo protegem os arquivos
+            indice = await indice_referencias()
+            apagados = apagar_orfaos(orfaos, indice, carencia=settings.MIDIA_GC_CARENCIA)
+            print(f'{len(apagados)} apagado(s); {len(orfaos) - len(apagados)} voltaram a ser usados')
+    finally:
+        await fechar_pool()
+
+    total: int = sum(orfao.tamanho for orfao in orfaos)
+
+    print(f'{len(orfaos)} arquivo(s) órfão(s), {total / 1024 / 1024:.1f} MB')
+    if orfaos and not apagar:
+        print('Nada foi apagado. Use --apagar para remover.')
+
+
+
+if __name__ == '__main__':
+    import asyncio
+
+    # python limpar_midia.py [--apagar]
+    asyncio.run(main(apagar='--apagar' in sys.argv[1:]))
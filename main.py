@@ -1,9 +1,17 @@
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
+from fastapi.requests import Request
 from fastapi.middleware import Middleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
+from starlette.concurrency import run_in_threadpool
 
+from core.auth import set_auth
+from core.configs import settings
+from core.database import abrir_janela_escrita, aquecer_pool, fechar_pool, finalizar_sessao_request
+from core.estaticos import ArquivosEstaticos, carregar_manifesto
+from core.imagens import servico_imagens
+from core.midia import MidiaStaticFiles
+from core.servico_hash import servico_hash
 from views import home_view, error_view
 from views.admin import admin_view
 
@@ -26,8 +34,56 @@ app = FastAPI(
     )
 app.include_router(home_view.router)
 app.include_router(admin_view.router)
-app.mount('/static', StaticFiles(directory='static'), name='static')
-app.mount('/media', StaticFiles(directory='media'), name='media')
+app.mount('/static', ArquivosEstaticos(directory='static', politica='static'), name='static')
+app.mount('/media', MidiaStaticFiles(directory=settings.MEDIA, politica='media'), name='media')
+
+
+@app.middleware('http')
+async def renova_auth(request: Request, call_next):
+    """
+    Reemite o cookie de autenticação no formato de token assinado quando
+    o request foi autenticado por um cookie antigo ou desatualizado
+    """
+    response = await call_next(request)
+
+    membro = getattr(request.state, 'renovar_auth', None)
+    if membro:
+        set_auth(response=response, membro=membro)
+
+    return response
+
+
+@app.middleware('http')
+async def unidade_de_trabalho(request: Request, call_next):
+    """
+    Confirma a sessão do request (status < 400) ou a desfaz, uma única vez,
+    antes de a resposta ser enviada. Depois de uma escrita, as próximas leituras
+    do navegador vão para o primário por alguns segundos.
+    """
+    try:
+        response = await call_next(request)
+    except Exception:
+        await finalizar_sessao_request(request, confirmar=False)
+        raise
+
+    if await finalizar_sessao_request(request, confirmar=response.status_code < 400):
+        abrir_janela_escrita(response)
+
+    return response
+
+
+@app.on_event('startup')
+async def startup() -> None:
+    await aquecer_pool()
+    # Versões do estatico() calculadas uma vez, fora do event loop
+    await run_in_threadpool(carregar_manifesto)
+
+
+@app.on_event('shutdown')
+async def shutdown() -> None:
+    servico_hash.encerrar()
+    await servico_imagens.encerrar()
+    await fechar_pool()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,5 @@
+"""
+Migrações versionadas do banco. Cada módulo mNNNN_<nome>.py define DESCRICAO e
+`async def aplicar(conn)`, e roda uma única vez, na ordem do número, dentro de uma
+transação. Use `python migrar.py` para aplicar as pendentes.
+"""
@@ -0,0 +1,99 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+DESCRICAO: str = 'Esquema inicial (o mesmo gerado antes pelo create_all)'
+
+# Bancos criados pelo create_all antigo já têm tudo isto: IF NOT EXISTS torna a migração inofensiva neles
+COMANDOS = [
+    '''CREATE TABLE IF NOT EXISTS areas (
+        id SERIAL NOT NULL,
+        area VARCHAR(100),
+        PRIMARY KEY (id)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS autores (
+        id SERIAL NOT NULL,
+        nome VARCHAR(100),
+        imagem VARCHAR(100),
+        PRIMARY KEY (id)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS membros (
+        id SERIAL NOT NULL,
+        nome VARCHAR(100),
+        funcao VARCHAR(100),
+        imagem VARCHAR(100),
+        email VARCHAR(100),
+        senha VARCHAR(400),
+        PRIMARY KEY (id)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS projetos (
+        id SERIAL NOT NULL,
+        data TIMESTAMP WITHOUT TIME ZONE,
+        titulo VARCHAR(100),
+        descricao_inicial VARCHAR(300),
+        imagem1 VARCHAR(100),
+        imagem2 VARCHAR(100),
+        imagem3 VARCHAR(100),
+        descricao_final VARCHAR(300),
+        link VARCHAR(200),
+        PRIMARY KEY (id)
+    )''',
+    'CREATE INDEX IF NOT EXISTS ix_projetos_data ON projetos (data)',
+    '''CREATE TABLE IF NOT EXISTS tags (
+        id SERIAL NOT NULL,
+        tag VARCHAR(100),
+        PRIMARY KEY (id)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS duvida (
+        id SERIAL NOT NULL,
+        id_area INTEGER,
+        titulo VARCHAR(200),
+        resposta VARCHAR(400),
+        PRIMARY KEY (id),
+        FOREIGN KEY (id_area) REFERENCES areas (id)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS posts (
+        id SERIAL NOT NULL,
+        data TIMESTAMP WITHOUT TIME ZONE,
+        titulo VARCHAR(200),
+        imagem VARCHAR(100),
+        texto VARCHAR(1000),
+        id_autor INTEGER,
+        PRIMARY KEY (id),
+        FOREIGN KEY (id_autor) REFERENCES autores (id)
+    )''',
+    'CREATE INDEX IF NOT EXISTS ix_posts_data ON posts (data)',
+    '''CREATE TABLE IF NOT EXISTS tags_autor (
+        id_autor INTEGER,
+        id_tag INTEGER,
+        FOREIGN KEY (id_autor) REFERENCES autores (id),
+        FOREIGN KEY (id_tag) REFERENCES tags (id)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS comentarios (
+        id SERIAL NOT NULL,
+        data TIMESTAMP WITHOUT TIME ZONE,
+        id_post INTEGER,
+        autor VARCHAR(200),
+        texto VARCHAR(400),
+        PRIMARY KEY (id),
+        FOREIGN KEY (id_post) REFERENCES posts (id)
+    )''',
+    'CREATE INDEX IF NOT EXISTS ix_comentarios_data ON comentarios (data)',
+    '''CREATE TABLE IF NOT EXISTS tags_post (
+        id_post INTEGER,
+        id_tag INTEGER,
+        FOREIGN KEY (id_post) REFERENCES posts (id),
+        FOREIGN KEY (id_tag) REFERENCES tags (id)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS comentarios_post (
+        id_post INTEGER,
+        id_comentario INTEGER,
+        FOREIGN KEY (id_post) REFERENCES posts (id),
+        FOREIGN KEY (id_comentario) REFERENCES comentarios (id)
+    )''',
+]
+
+
+async def aplicar(conn: AsyncConnection) -> None:
+    for comando in COMANDOS:
+        await conn.execute(text(comando))
@@ -0,0 +1,67 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from core.migrador import criar_indice_concorrente
+
+
+DESCRICAO: str = 'Índices das consultas quentes e chaves primárias das tabelas de associação'
+
+# Índices criados com CONCURRENTLY, que não roda dentro de transação: posts e comentarios
+# continuam aceitando escritas enquanto os índices são construídos
+TRANSACAO: bool = False
+
+# (tabela, coluna da esquerda, coluna da direita)
+ASSOCIACOES = [
+    ('tags_post', 'id_post', 'id_tag'),
+    ('tags_autor', 'id_autor', 'id_tag'),
+    ('comentarios_post', 'id_post', 'id_comentario'),
+]
+
+# (nome, tabela e colunas, único)
+INDICES = [
+    # Paginação por keyset (data, id); substituem os índices só de data
+    ('ix_posts_data_id', 'posts (data, id)', False),
+    ('ix_comentarios_data_id', 'comentarios (data, id)', False),
+    ('ix_projetos_data_id', 'projetos (data, id)', False),
+    # Chaves estrangeiras usadas em filtros e joins
+    ('ix_comentarios_id_post', 'comentarios (id_post)', False),
+    ('ix_posts_id_autor', 'posts (id_autor)', False),
+    ('ix_duvida_id_area', 'duvida (id_area)', False),
+    # Login
+    ('ux_membros_email', 'membros (email)', True),
+]
+
+SUBSTITUIDOS = ['ix_posts_data', 'ix_comentarios_data', 'ix_projetos_data']
+
+
+async def aplicar(conn: AsyncConnection) -> None:
+    # O índice único falharia com uma mensagem pouco clara; os membros duplicados precisam ser resolvidos à mão
+    result = await conn.execute(text('SELECT email FROM membros GROUP BY email HAVING count(*) > 1'))
+    duplicados = [linha[0] for linha in result.all()]
+    if duplicados:
+        raise RuntimeError(f'Emails repetidos em membros, resolva antes de migrar: {", ".join(duplicados)}')
+
+    for tabela, esquerda, direita in ASSOCIACOES:
+        # Linhas incompletas ou repetidas impedem a chave primária e não representam nada
+        await conn.execute(text(f'DELETE FROM {tabela} WHERE {esquerda} IS NULL OR {direita} IS NULL'))
+        await conn.execute(text(
+            f'DELETE FROM {tabela} a USING {tabela} b '
+            f'WHERE a.{esquerda} = b.{esquerda} AND a.{direita} = b.{direita} AND a.ctid > b.ctid'
+        ))
+
+        result = await conn.execute(text(
+            "SELECT 1 FROM pg_constraint WHERE conrelid = CAST(:tabela AS regclass) AND contype = 'p'"
+        ), {"tabela": tabela})
+        if result.first() is None:
+            # O índice único é construído sem bloquear a tabela; a chave primária só o adota
+            await criar_indice_concorrente(conn, f'{tabela}_pkey', f'{tabela} ({esquerda}, {direita})', unico=True)
+            await conn.execute(text(f'ALTER TABLE {tabela} ADD CONSTRAINT {tabela}_pkey PRIMARY KEY USING INDEX {tabela}_pkey'))
+
+        # A chave primária atende a busca pela esquerda; este índice atende a busca pela direita
+        await criar_indice_concorrente(conn, f'ix_{tabela}_{direita}', f'{tabela} ({direita})')
+
+    for nome, definicao, unico in INDICES:
+        await criar_indice_concorrente(conn, nome, definicao, unico=unico)
+
+    for nome in SUBSTITUIDOS:
+        await conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS {nome}'))
@@ -0,0 +1,34 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+DESCRICAO: str = 'ON DELETE CASCADE nas associações e nos comentários do post'
+
+# (tabela, coluna, tabela referenciada)
+CHAVES = [
+    ('tags_post', 'id_post', 'posts'),
+    ('tags_post', 'id_tag', 'tags'),
+    ('tags_autor', 'id_autor', 'autores'),
+    ('tags_autor', 'id_tag', 'tags'),
+    ('comentarios_post', 'id_post', 'posts'),
+    ('comentarios_post', 'id_comentario', 'comentarios'),
+    ('comentarios', 'id_post', 'posts'),
+]
+
+
+async def aplicar(conn: AsyncConnection) -> None:
+    for tabela, coluna, referencia in CHAVES:
+        # O nome da constraint atual depende de como a tabela foi criada; busca pela coluna
+        result = await conn.execute(text(
+            "SELECT c.conname FROM pg_constraint c "
+            "JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = ANY (c.conkey) "
+            "WHERE c.conrelid = CAST(:tabela AS regclass) AND c.contype = 'f' AND a.attname = :coluna"
+        ), {"tabela": tabela, "coluna": coluna})
+
+        for (nome,) in result.all():
+            await conn.execute(text(f'ALTER TABLE {tabela} DROP CONSTRAINT {nome}'))
+
+        await conn.execute(text(
+            f'ALTER TABLE {tabela} ADD CONSTRAINT {tabela}_{coluna}_fkey '
+            f'FOREIGN KEY ({coluna}) REFERENCES {referencia} (id) ON DELETE CASCADE'
+        ))
@@ -0,0 +1,26 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+DESCRICAO: str = 'Comentários ligados ao post só pela FK comentarios.id_post (remove comentarios_post)'
+
+
+async def aplicar(conn: AsyncConnection) -> None:
+    # Comentários que só existiam na associação passam para a FK (o menor id_post, se houver mais de um)
+    result = await conn.execute(text(
+        'UPDATE comentarios c SET id_post = cp.id_post '
+        'FROM (SELECT id_comentario, min(id_post) AS id_post FROM comentarios_post GROUP BY id_comentario) cp '
+        'WHERE cp.id_comentario = c.id AND c.id_post IS NULL'
+    ))
+    print(f'{result.rowcount} comentário(s) recuperado(s) de comentarios_post')
+
+    # Onde os dois discordam, vale a FK, que é o que o ComentarioController sempre gravou
+    result = await conn.execute(text(
+        'SELECT count(*) FROM comentarios_post cp JOIN comentarios c ON c.id = cp.id_comentario '
+        'WHERE c.id_post <> cp.id_post'
+    ))
+    divergentes: int = result.scalar()
+    if divergentes:
+        print(f'{divergentes} ligação(ões) de comentarios_post divergiam da FK e foram descartadas')
+
+    await conn.execute(text('DROP TABLE comentarios_post'))
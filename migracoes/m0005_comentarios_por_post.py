@@ -0,0 +1,16 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from core.migrador import criar_indice_concorrente
+
+
+DESCRICAO: str = 'Índice (id_post, data, id) para paginar e contar os comentários de cada post'
+
+# CREATE INDEX CONCURRENTLY: comentarios continua aceitando escritas durante a construção
+TRANSACAO: bool = False
+
+
+async def aplicar(conn: AsyncConnection) -> None:
+    await criar_indice_concorrente(conn, 'ix_comentarios_id_post_data_id', 'comentarios (id_post, data, id)')
+    # O novo índice começa por id_post e atende tudo o que o antigo atendia
+    await conn.execute(text('DROP INDEX CONCURRENTLY IF EXISTS ix_comentarios_id_post'))
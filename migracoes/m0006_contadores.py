@@ -0,0 +1,35 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from core.migrador import criar_indice_concorrente
+
+
+DESCRICAO: str = 'Contadores posts.total_comentarios e tags.total_posts'
+
+# Os índices são construídos com CONCURRENTLY (fora de transação). Cada comando é atômico
+# e refazer a contagem inteira é inofensivo se a migração rodar de novo.
+TRANSACAO: bool = False
+
+COMANDOS = [
+    'ALTER TABLE posts ADD COLUMN IF NOT EXISTS total_comentarios INTEGER NOT NULL DEFAULT 0',
+    'ALTER TABLE tags ADD COLUMN IF NOT EXISTS total_posts INTEGER NOT NULL DEFAULT 0',
+    '''UPDATE posts p SET total_comentarios = c.total
+       FROM (SELECT id_post, count(*) AS total FROM comentarios GROUP BY id_post) c
+       WHERE c.id_post = p.id''',
+    '''UPDATE tags t SET total_posts = c.total
+       FROM (SELECT id_tag, count(*) AS total FROM tags_post GROUP BY id_tag) c
+       WHERE c.id_tag = t.id''',
+]
+
+INDICES = [
+    ('ix_posts_total_comentarios_id', 'posts (total_comentarios, id)'),
+    ('ix_tags_total_posts_id', 'tags (total_posts, id) INCLUDE (tag)'),
+]
+
+
+async def aplicar(conn: AsyncConnection) -> None:
+    for comando in COMANDOS:
+        await conn.execute(text(comando))
+
+    for nome, definicao in INDICES:
+        await criar_indice_concorrente(conn, nome, definicao)
@@ -0,0 +1,9 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+DESCRICAO: str = 'Coluna membros.versao_token para revogar os tokens de sessão de um membro'
+
+
+async def aplicar(conn: AsyncConnection) -> None:
+    await conn.execute(text('ALTER TABLE membros ADD COLUMN IF NOT EXISTS versao_token INTEGER NOT NULL DEFAULT 0'))
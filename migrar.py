@@ -0,0 +1,35 @@
+import sys
+
+from core.migrador import migrar, situacao, verificar_planos
+
+
+async def main(argumentos: list) -> int:
+    comando: str = argumentos[0] if argumentos else 'aplicar'
+
+    if comando == 'aplicar':
+        alvo = int(argumentos[1]) if len(argumentos) > 1 else None
+        aplicadas = await migrar(alvo=alvo)
+        print(f'{len(aplicadas)} migração(ões) aplicada(s)')
+        return 0
+
+    if comando == 'status':
+        for versao, nome, aplicada in await situacao():
+            print(f'{"[x]" if aplicada else "[ ]"} {nome}')
+        return 0
+
+    if comando == 'explain':
+        falhas = await verificar_planos()
+        for falha in falhas:
+            print(f'Seq Scan em {falha}\n')
+        print('Nenhuma consulta quente faz Seq Scan' if not falhas else f'{len(falhas)} consulta(s) sem índice')
+        return 1 if falhas else 0
+
+    print('Uso: python migrar.py [aplicar [versão] | status | explain]')
+    return 2
+
+
+
+if __name__ == '__main__':
+    import asyncio
+
+    sys.exit(asyncio.run(main(sys.argv[1:])))
@@ -0,0 +1,24 @@
+import sys
+
+from core.configs import settings
+from core.database import fechar_pool
+from core.midia import COLUNAS, migrando, migrar_campo
+
+
+async def main(lote: int) -> None:
+    try:
+        # O limpar_midia.py se recusa a rodar enquanto a marca existir
+        with migrando():
+            for campo in COLUNAS:
+                registros, movidos = await migrar_campo(campo, lote)
+                print(f'{campo}: {registros} registro(s) regravado(s), {movidos} arquivo(s) movido(s)')
+    finally:
+        await fechar_pool()
+
+
+
+if __name__ == '__main__':
+    import asyncio
+
+    # python migrar_midia.py [lote]
+    asyncio.run(main(lote=int(sys.argv[1]) if len(sys.argv) > 1 else settings.MIDIA_MIGRACAO_LOTE))
@@ -11,8 +11,8 @@ from models.tag_model import TagModel
 tags_autor = Table(
     'tags_autor',
     settings.DBBaseModel.metadata,
-    Column('id_autor', Integer, ForeignKey('autores.id')),
-    Column('id_tag', Integer, ForeignKey('tags.id'))
+    Column('id_autor', Integer, ForeignKey('autores.id', ondelete='CASCADE'), primary_key=True),
+    Column('id_tag', Integer, ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True, index=True)
 )
 
 
@@ -25,7 +25,7 @@ class AutorModel(settings.DBBaseModel):
     imagem: str = Column(String(100)) # 40x40
 
     # Um autor pode ter várias tags
-    tags: List[TagModel] = orm.relationship('TagModel', secondary=tags_autor, backref='taga', lazy='joined')
+    tags: List[TagModel] = orm.relationship('TagModel', secondary=tags_autor, backref=orm.backref('taga', passive_deletes=True), passive_deletes=True)
     
     @property
     def get_tags_list(self):
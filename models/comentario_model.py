@@ -5,17 +5,22 @@ import sqlalchemy.orm as orm
 from core.configs import settings
 from models.post_model import PostModel
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 
 
 class ComentarioModel(settings.DBBaseModel):
     __tablename__: str = 'comentarios'
+    # Paginação por keyset (data, id), geral e por post; o segundo também atende a contagem por post
+    __table_args__ = (
+        Index('ix_comentarios_data_id', 'data', 'id'),
+        Index('ix_comentarios_id_post_data_id', 'id_post', 'data', 'id'),
+    )
 
     id: int = Column(Integer, primary_key=True, autoincrement=True)
-    data: datetime = Column(DateTime, default=datetime.now, index=True)
+    data: datetime = Column(DateTime, default=datetime.now)
 
-    id_post: int = Column(Integer, ForeignKey('posts.id'))
-    post: PostModel = orm.relationship('PostModel', lazy='joined')
+    id_post: int = Column(Integer, ForeignKey('posts.id', ondelete='CASCADE'))
+    post: PostModel = orm.relationship('PostModel', back_populates='comentarios')
 
     autor: str = Column(String(200))
     texto: str = Column(String(400))
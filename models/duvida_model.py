@@ -11,8 +11,8 @@ class DuvidaModel(settings.DBBaseModel):
 
     id: int = Column(Integer, primary_key=True, autoincrement=True)
 
-    id_area: int = Column(Integer, ForeignKey('areas.id'))
-    area: AreaModel = orm.relationship('AreaModel', lazy='joined')
+    id_area: int = Column(Integer, ForeignKey('areas.id'), index=True)
+    area: AreaModel = orm.relationship('AreaModel')
 
     titulo: str = Column(String(200))
     resposta: str = Column(String(400))
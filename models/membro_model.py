@@ -1,11 +1,13 @@
 from core.configs import settings
 
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Index
 from sqlalchemy.orm import validates
 
 
 class MembroModel(settings.DBBaseModel):
     __tablename__: str = 'membros'
+    # Login busca pelo email
+    __table_args__ = (Index('ux_membros_email', 'email', unique=True),)
 
     id: int = Column(Integer, primary_key=True, autoincrement=True)
     nome: str = Column(String(100))
@@ -13,6 +15,8 @@ class MembroModel(settings.DBBaseModel):
     imagem: str = Column(String(100)) # 150x150
     email: str = Column(String(100))
     senha: str = Column(String(400))
+    # Vai no token de sessão; incrementar revoga os tokens já emitidos do membro
+    versao_token: int = Column(Integer, nullable=False, default=0, server_default='0')
 
     @validates('funcao')
     def _valida_funcao(self, key, value):
@@ -7,46 +7,55 @@ from core.configs import settings
 from models.tag_model import TagModel
 from models.autor_model import AutorModel
 
-from sqlalchemy import Table, Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Table, Column, Integer, String, DateTime, ForeignKey, Index
 
 
 # Post pode ter várias tags
 tags_post = Table(
     'tags_post',
     settings.DBBaseModel.metadata,
-    Column('id_post', Integer, ForeignKey('posts.id')),
-    Column('id_tag', Integer, ForeignKey('tags.id'))
-)
-
-# Post pode ter vários comentários
-comentarios_post = Table(
-    'comentarios_post',
-    settings.DBBaseModel.metadata,
-    Column('id_post', Integer, ForeignKey('posts.id')),
-    Column('id_comentario', Integer, ForeignKey('comentarios.id'))
+    Column('id_post', Integer, ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True),
+    Column('id_tag', Integer, ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True, index=True)
 )
 
 
 class PostModel(settings.DBBaseModel):
     """Posts do blog"""
     __tablename__: str = 'posts'
+    # Paginação por keyset: (data, id) e por quantidade de comentários
+    __table_args__ = (
+        Index('ix_posts_data_id', 'data', 'id'),
+        Index('ix_posts_total_comentarios_id', 'total_comentarios', 'id'),
+    )
 
     id: int = Column(Integer, primary_key=True, autoincrement=True)
-    data: datetime = Column(DateTime, default=datetime.now, index=True)
+    data: datetime = Column(DateTime, default=datetime.now)
 
     titulo: str = Column(String(200))
     
     # Um Post pode ter várias tags
-    tags: List[TagModel] = orm.relationship('TagModel', secondary=tags_post, backref='tagp', lazy='joined')
+    # As linhas de associação são removidas pelo banco (ON DELETE CASCADE), sem carregar a coleção
+    tags: List[TagModel] = orm.relationship('TagModel', secondary=tags_post, backref=orm.backref('tagp', passive_deletes=True), passive_deletes=True)
 
     imagem: str = Column(String(100)) # 900x400
     texto: str = Column(String(1000))
 
+    # Mantido pelo ComentarioController na mesma transação; `python reparar_contadores.py` recalcula
+    total_comentarios: int = Column(Integer, nullable=False, default=0, server_default='0')
+
     # Um Post pode ter vários comentários (Não importamos e usamos ComentarioModel como tipo de dados aqui pois causa erro de import circular com a tabela ComentarioModel)
-    comentarios: List[object] = orm.relationship('ComentarioModel', secondary=comentarios_post, backref='comentario', lazy='joined')
+    # Pela FK comentarios.id_post, do mais novo para o mais antigo. Nunca é carregado implicitamente:
+    # use ComentarioController.get_comentarios_post, que limita a quantidade.
+    comentarios: List[object] = orm.relationship(
+        'ComentarioModel',
+        back_populates='post',
+        order_by='[ComentarioModel.data.desc(), ComentarioModel.id.desc()]',
+        lazy='raise',
+        passive_deletes=True
+    )
 
-    id_autor: int = Column(Integer, ForeignKey('autores.id'))
-    autor: AutorModel = orm.relationship('AutorModel', lazy='joined')
+    id_autor: int = Column(Integer, ForeignKey('autores.id'), index=True)
+    autor: AutorModel = orm.relationship('AutorModel')
     
     @property
     def get_tags_list(self):
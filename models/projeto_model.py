@@ -2,15 +2,17 @@ from datetime import datetime
 
 from core.configs import settings
 
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index
 
 
 class ProjetoModel(settings.DBBaseModel):
     """No website temos um portfólio de projetos"""
     __tablename__: str = 'projetos'
+    # Paginação por keyset (data, id)
+    __table_args__ = (Index('ix_projetos_data_id', 'data', 'id'),)
 
     id: int = Column(Integer, primary_key=True, autoincrement=True)
-    data: datetime = Column(DateTime, default=datetime.now, index=True)
+    data: datetime = Column(DateTime, default=datetime.now)
     
     titulo: str = Column(String(100))
     descricao_inicial: str = Column(String(300))
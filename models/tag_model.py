@@ -1,12 +1,17 @@
 from core.configs import settings
 
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Index
 
 
 class TagModel(settings.DBBaseModel):
     """Temos tags em várias partes do website"""
     __tablename__: str = 'tags'
+    # Ordenação por uso (listagem e nuvem de tags) lida só do índice
+    __table_args__ = (Index('ix_tags_total_posts_id', 'total_posts', 'id', postgresql_include=['tag']),)
 
     id: int = Column(Integer, primary_key=True, autoincrement=True)
     tag: str = Column(String(100))
 
+    # Posts que usam a tag, mantido pelo PostController; `python reparar_contadores.py` recalcula
+    total_posts: int = Column(Integer, nullable=False, default=0, server_default='0')
+
@@ -0,0 +1,9 @@
+from core.contadores import reparar_contadores
+
+
+
+if __name__ == '__main__':
+    import asyncio
+
+    for contador, linhas in asyncio.run(reparar_contadores()).items():
+        print(f'{contador}: {linhas} linha(s) corrigida(s)')
@@ -0,0 +1,234 @@
+"""
+Consultas e linhas de cada perfil de carregamento ('lista', 'detalhe' e os dropdowns),
+contadas num banco SQLite. Um relacionamento com lazy='joined' esquecido multiplica
+as linhas (produto cartesiano) ou acrescenta consultas e quebra estes números.
+"""
+import asyncio
+import os
+import tempfile
+
+ARQUIVO_DB: str = os.path.join(tempfile.gettempdir(), 'fapiw_perfis_carregamento.sqlite3')
+os.environ['DB_URL'] = f'sqlite+aiosqlite:///{ARQUIVO_DB}'
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+from starlette.requests import Request
+
+from controllers.autor_controller import AutorController
+from controllers.base_controller import BaseController
+from controllers.comentario_controller import ComentarioController
+from controllers.duvida_controller import DuvidaController
+from controllers.post_controller import PostController
+from core.configs import settings
+from core.database import engine, get_session
+from core.referencias import referencias
+from models.__all_models import AreaModel, AutorModel, ComentarioModel, DuvidaModel, PostModel, TagModel
+
+
+TAGS: int = 10
+TAGS_AUTOR: int = 3
+POSTS: int = 5
+TAGS_POST: int = 5
+COMENTARIOS_POST: int = 4
+DUVIDAS: int = 2
+
+
+class Contador:
+    """Consultas executadas e linhas devolvidas por cada uma"""
+
+    def __init__(self) -> None:
+        self.linhas: list = []
+
+    @property
+    def consultas(self) -> int:
+        return len(self.linhas)
+
+
+contador: Contador = Contador()
+
+
+@event.listens_for(engine.sync_engine, 'after_cursor_execute')
+def contar(conn, cursor, statement, parameters, context, executemany) -> None:
+    # O cursor do aiosqlite já traz todas as linhas do SELECT em _rows
+    contador.linhas.append(len(getattr(cursor, '_rows', None) or []))
+
+
+def rodar(coro) -> None:
+    async def executar():
+        try:
+            await coro
+        finally:
+            # As conexões do aiosqlite ficam presas ao event loop de cada teste
+            await engine.dispose()
+
+    asyncio.run(executar())
+
+
+def novo_request() -> Request:
+    return Request({'type': 'http', 'method': 'GET', 'path': '/', 'headers': [], 'query_string': b''})
+
+
+async def medir(consulta) -> Contador:
+    contador.linhas = []
+    await consulta
+    medido: Contador = Contador()
+    medido.linhas = contador.linhas
+    contador.linhas = []
+    return medido
+
+
+async def fechar(request: Request) -> None:
+    session = getattr(request.state, 'sessao', None)
+    if session is not None:
+        await session.close()
+
+
+@pytest.fixture(scope='module', autouse=True)
+def banco():
+    if os.path.exists(ARQUIVO_DB):
+        os.remove(ARQUIVO_DB)
+
+    async def criar():
+        async with engine.begin() as conn:
+            await conn.run_sync(settings.DBBaseModel.metadata.create_all)
+
+        async with get_session() as session:
+            tags = [TagModel(tag=f'tag{i}') for i in range(TAGS)]
+            area = AreaModel(area='Python')
+            autor = AutorModel(nome='Autor', imagem='a.png', tags=tags[:TAGS_AUTOR])
+            session.add_all([*tags, area, autor])
+            await session.flush()
+
+            for i in range(POSTS):
+                post = PostModel(titulo=f'post{i}', imagem='p.png', texto='texto', id_autor=autor.id, tags=tags[:TAGS_POST])
+                session.add(post)
+                await session.flush()
+                session.add_all([ComentarioModel(id_post=post.id, autor='leitor', texto='oi') for _ in range(COMENTARIOS_POST)])
+
+            session.add_all([DuvidaModel(id_area=area.id, titulo=f'duvida{i}', resposta='r') for i in range(DUVIDAS)])
+            await session.commit()
+
+    rodar(criar())
+    yield
+    os.remove(ARQUIVO_DB)
+
+
+@pytest.fixture(autouse=True)
+def caches_vazios():
+    for controller in (PostController, AutorController, ComentarioController, DuvidaController):
+        if controller.cache_entidades is not None:
+            controller.cache_entidades.limpar()
+    for tabela in ('tags', 'areas', 'autores'):
+        referencias.invalidar(tabela)
+
+
+def test_post_lista():
+    async def teste():
+        request = novo_request()
+        medido = await medir(PostController(request).get_all_crud())
+
+        # posts + autor no JOIN (uma linha por post) e as tags em um SELECT IN
+        assert medido.consultas == 2
+        assert medido.linhas == [POSTS, POSTS * TAGS_POST]
+
+        await fechar(request)
+
+    rodar(teste())
+
+
+def test_post_detalhe():
+    async def teste():
+        request = novo_request()
+        controller = PostController(request)
+        medido = await medir(controller.get_one_crud(id_obj=1))
+
+        assert medido.consultas == 2
+        assert medido.linhas == [1, TAGS_POST]
+
+        post = await controller.get_one_crud(id_obj=1)
+        # Fora do perfil: nem comentários nem as tags do autor são carregados
+        with pytest.raises(InvalidRequestError):
+            post.comentarios
+        with pytest.raises(InvalidRequestError):
+            post.autor.tags
+
+        # O segundo acesso vem do cache de entidades, somente leitura
+        assert (await medir(controller.get_one_crud(id_obj=1))).consultas == 0
+        assert post.get_tags_list == list(range(1, TAGS_POST + 1))
+        with pytest.raises(TypeError):
+            post.titulo = 'outro'
+
+        await fechar(request)
+
+    rodar(teste())
+
+
+def test_autor_lista_e_detalhe():
+    async def teste():
+        request = novo_request()
+        controller = AutorController(request)
+
+        medido = await medir(controller.get_all_crud())
+        assert medido.consultas == 2
+        assert medido.linhas == [1, TAGS_AUTOR]
+
+        medido = await medir(controller.get_one_crud(id_obj=1))
+        assert medido.consultas == 2
+        assert medido.linhas == [1, TAGS_AUTOR]
+
+        await fechar(request)
+
+    rodar(teste())
+
+
+def test_comentario_lista():
+    async def teste():
+        request = novo_request()
+        medido = await medir(ComentarioController(request).get_all_crud())
+
+        # O post de cada comentário vem no JOIN, sem as tags nem o autor dele
+        assert medido.consultas == 1
+        assert medido.linhas == [POSTS * COMENTARIOS_POST]
+
+        await fechar(request)
+
+    rodar(teste())
+
+
+def test_duvida_lista():
+    async def teste():
+        request = novo_request()
+        medido = await medir(DuvidaController(request).get_all_crud())
+
+        assert medido.consultas == 1
+        assert medido.linhas == [DUVIDAS]
+
+        await fechar(request)
+
+    rodar(teste())
+
+
+def test_dropdowns():
+    async def teste():
+        request = novo_request()
+        controller: BaseController = PostController(request)
+
+        # Só (id, label), sem relacionamentos; a tabela de referência vai para a memória
+        medido = await medir(controller.get_opcoes(TagModel, 'tag'))
+        assert medido.consultas == 1
+        assert medido.linhas == [TAGS]
+        assert (await medir(controller.get_opcoes(TagModel, 'tag'))).consultas == 0
+
+        # Com filtro a consulta vai ao banco, ainda sem relacionamentos
+        medido = await medir(controller.get_opcoes(AutorModel, 'nome', filtro=AutorModel.id > 0))
+        assert medido.consultas == 1
+        assert medido.linhas == [1]
+
+        medido = await medir(controller.get_objetos(AreaModel))
+        assert medido.consultas == 1
+        assert medido.linhas == [1]
+
+        await fechar(request)
+
+    rodar(teste())
@@ -1,8 +1,10 @@
 from fastapi.routing import APIRouter
 from fastapi.requests import Request
-from fastapi import status
+from fastapi import Depends
+from fastapi.responses import JSONResponse
 
 from core.configs import settings
+from core.metricas import coletar_metricas
 from views.admin.membro_admin import membro_admin
 from views.admin.area_admin import area_admin
 from views.admin.autor_admin import autor_admin
@@ -11,9 +13,10 @@ from views.admin.duvida_admin import duvida_admin
 from views.admin.post_admin import post_admin
 from views.admin.projeto_admin import projeto_admin
 from views.admin.tag_admin import tag_admin
-from core.deps import valida_login
+from core.deps import valida_login, get_contexto
 
-router = APIRouter(prefix="/admin")
+# O membro é resolvido uma única vez por request, antes de qualquer handler do /admin
+router = APIRouter(prefix="/admin", dependencies=[Depends(valida_login)])
 router.include_router(membro_admin.router)
 router.include_router(area_admin.router)
 router.include_router(autor_admin.router)
@@ -26,12 +29,11 @@ router.include_router(tag_admin.router)
 
 @router.get('/', name='admin_index')
 async def admin_index(request: Request):
-    context = await valida_login(request)
-    try:
-        if not context["membro"]:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-    except KeyError:
-        return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
+    context = get_contexto(request)
 
     return settings.TEMPLATES.TemplateResponse('admin/index.html', context=context)
 
+
+@router.get('/metricas', name='admin_metricas')
+async def admin_metricas(request: Request):
+    return JSONResponse(coletar_metricas())
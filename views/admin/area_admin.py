@@ -6,7 +6,7 @@ from fastapi.exceptions import HTTPException
 from core.configs import settings
 from controllers.area_controller import AreaController
 from views.admin.base_crud_view import BaseCrudView
-from core.deps import valida_login
+from core.deps import get_contexto
 
 
 class AreaAdmin(BaseCrudView):
@@ -20,14 +20,6 @@ class AreaAdmin(BaseCrudView):
         """
         Rota para listar todos as areas [GET]
         """
-
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-
         area_controller: AreaController = AreaController(request)
 
         return await super().object_list(object_controller=area_controller)
@@ -37,13 +29,6 @@ class AreaAdmin(BaseCrudView):
         """
         Rota para deletar uma area [DELETE]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-
         area_controller: AreaController = AreaController(request)
 
         area_id: int = request.path_params["obj_id"]
@@ -55,12 +40,7 @@ class AreaAdmin(BaseCrudView):
         """
         Rota para carregar o template do formulário e criar um objeto [GET, POST]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
+        context = get_contexto(request)
 
         area_controller: AreaController = AreaController(request)
 
@@ -88,12 +68,7 @@ class AreaAdmin(BaseCrudView):
         """
         Rota para carregar o template do formulário de edição e atualizar uma area [GET, POST]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
+        context = get_contexto(request)
 
         area_controller: AreaController = AreaController(request)
 
@@ -104,7 +79,7 @@ class AreaAdmin(BaseCrudView):
             return await super().object_details(object_controller=area_controller, obj_id=area_id)
         
         # Se o request for POST
-        area_obj = await area_controller.get_one_crud(id_obj=area_id)
+        area_obj = await area_controller.get_one_crud(id_obj=area_id, edicao=True)
 
         if not area_obj:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
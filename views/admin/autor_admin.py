@@ -10,7 +10,7 @@ from core.configs import settings
 from controllers.autor_controller import AutorController
 from views.admin.base_crud_view import BaseCrudView
 from models.tag_model import TagModel
-from core.deps import valida_login
+from core.deps import get_contexto
 
 
 class AutorAdmin(BaseCrudView):
@@ -24,13 +24,6 @@ class AutorAdmin(BaseCrudView):
         """
         Rota para listar todos os autores [GET]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-
         autor_controller: AutorController = AutorController(request)
 
         return await super().object_list(object_controller=autor_controller)
@@ -40,15 +33,6 @@ class AutorAdmin(BaseCrudView):
         """
         Rota para deletar um autor [DELETE]
         """
-
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-
-
         autor_controller: AutorController = AutorController(request)
 
         autor_id: int = request.path_params["obj_id"]
@@ -60,19 +44,14 @@ class AutorAdmin(BaseCrudView):
         """
         Rota para carregar o template do formulário e criar um objeto [GET, POST]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
+        context = get_contexto(request)
 
         autor_controller: AutorController = AutorController(request)
 
         # Se o request for GET
         if request.method == 'GET':
             # Adicionar o request e as tags no context
-            tags = await autor_controller.get_objetos(model_obj=TagModel)
+            tags = await autor_controller.get_opcoes(model_obj=TagModel, coluna_label='tag')
             context.update({"tags": tags})
 
             return settings.TEMPLATES.TemplateResponse(f"admin/autor/create.html", context=context)
@@ -98,12 +77,7 @@ class AutorAdmin(BaseCrudView):
         """
         Rota para carregar o template do formulário de edição e atualizar um autor [GET, POST]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
+        context = get_contexto(request)
 
         autor_controller: AutorController = AutorController(request)
 
@@ -114,19 +88,19 @@ class AutorAdmin(BaseCrudView):
             return await super().object_details(object_controller=autor_controller, obj_id=autor_id)
         
         elif request.method == 'GET' and 'edit' in str(autor_controller.request.url):
-            autor = await autor_controller.get_one_crud(id_obj=autor_id)
+            autor = await autor_controller.get_one_crud(id_obj=autor_id, edicao=True)
 
             if not autor:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
             
             # Adicionar o request e as tags no context
-            tags = await autor_controller.get_objetos(model_obj=TagModel)
+            tags = await autor_controller.get_opcoes(model_obj=TagModel, coluna_label='tag')
             context.update({"objeto": autor, "tags": tags})
 
             return settings.TEMPLATES.TemplateResponse(f"admin/autor/edit.html", context=context)
         
         # Se o request for POST
-        autor = await autor_controller.get_one_crud(id_obj=autor_id)
+        autor = await autor_controller.get_one_crud(id_obj=autor_id, edicao=True)
 
         if not autor:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
@@ -141,7 +115,7 @@ class AutorAdmin(BaseCrudView):
             nome: str = form.get('nome')
             tags: List[str] = form.getlist('tags')
             dados = {"id": autor_id, "nome": nome, "tags": tags}
-            context.update({"error": err, "dados": dados})
+            context.update({"error": err, "objeto": dados})
             return settings.TEMPLATES.TemplateResponse("admin/autor/edit.html", context=context)
         
         return RedirectResponse(request.url_for("autor_list"), status_code=status.HTTP_302_FOUND)
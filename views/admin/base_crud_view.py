@@ -5,8 +5,8 @@ from fastapi.responses import Response
 from fastapi.exceptions import HTTPException
 
 from core.configs import settings
-from controllers.base_controller import BaseController
-from core.deps import valida_login
+from controllers.base_controller import BaseController, Pagina
+from core.deps import get_contexto
 
 
 class BaseCrudView:
@@ -41,40 +41,42 @@ class BaseCrudView:
         """
         Rota para listar todos os objetos [GET]
         """
-        context = await valida_login(object_controller.request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
+        context = get_contexto(object_controller.request)
 
-        dados = await object_controller.get_all_crud()
+        # Paginação por keyset: ?cursor=<cursor>&dir=anterior
+        params = object_controller.request.query_params
+        try:
+            pagina = await object_controller.get_all_crud(cursor=params.get('cursor'), anterior=params.get('dir') == 'anterior',
+                                                          ordem=params.get('ordem'))
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
 
-        context.update({"dados": dados})
+        context.update({"dados": pagina.itens, "pagina": pagina})
+        context.update(await self.contexto_lista(object_controller=object_controller, pagina=pagina))
 
         return settings.TEMPLATES.TemplateResponse(f"admin/{self.template_base}/list.html", context=context)
 
 
-    async def object_delete(self, object_controller: BaseController, obj_id: int) -> Response:
+    async def contexto_lista(self, object_controller: BaseController, pagina: Pagina) -> dict:
         """
-        Rota para deletar um objeto [DELETE]
+        Dados extras para o template da listagem (ex: contagens da página)
         """
-        
-        context = await valida_login(object_controller.request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
+        return {}
 
 
-        objeto = await object_controller.get_one_crud(id_obj=obj_id)
+    async def contexto_detalhes(self, object_controller: BaseController, objeto: object) -> dict:
+        """
+        Dados extras para o template de detalhes
+        """
+        return {}
 
-        if not objeto:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
-        
-        await object_controller.del_crud(id_obj=objeto.id)
 
+    async def object_delete(self, object_controller: BaseController, obj_id: int) -> Response:
+        """
+        Rota para deletar um objeto [DELETE]
+        """
+        if await object_controller.del_crud(id_obj=obj_id) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
 
         return Response(object_controller.request.url_for(f"{self.template_base}_list"))
 
@@ -84,21 +86,18 @@ class BaseCrudView:
         Rota para apresentar os detalhes de um objeto [GET]
         """
         
-        context = await valida_login(object_controller.request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        
-                
-        objeto = await object_controller.get_one_crud(id_obj=obj_id)
+        context = get_contexto(object_controller.request)
+
+        # O formulário de edição é montado do primário, sem o cache de entidades
+        edicao: bool = 'edit' in str(object_controller.request.url) and 'details' not in str(object_controller.request.url)
+        objeto = await object_controller.get_one_crud(id_obj=obj_id, edicao=edicao)
 
         if not objeto:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
         
         context.update({"objeto": objeto}
         )
+        context.update(await self.contexto_detalhes(object_controller=object_controller, objeto=objeto))
         if 'details' in str(object_controller.request.url):
             return settings.TEMPLATES.TemplateResponse(f"admin/{self.template_base}/details.html", context=context)
         
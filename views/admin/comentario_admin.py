@@ -10,8 +10,7 @@ from fastapi.exceptions import HTTPException
 from core.configs import settings
 from controllers.comentario_controller import ComentarioController
 from views.admin.base_crud_view import BaseCrudView
-from models.post_model import PostModel
-from core.deps import valida_login
+from core.deps import get_contexto
 
 class ComentarioAdmin(BaseCrudView):
 
@@ -24,14 +23,6 @@ class ComentarioAdmin(BaseCrudView):
         """
         Rota para listar todos os comentários [GET]
         """
-
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-
         comentario_controller: ComentarioController = ComentarioController(request)
 
         return await super().object_list(object_controller=comentario_controller)
@@ -41,14 +32,6 @@ class ComentarioAdmin(BaseCrudView):
         """
         Rota para deletar um membro [DELETE]
         """
-
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-
         comentario_controller: ComentarioController = ComentarioController(request)
 
         comentario_id: int = request.path_params["obj_id"]
@@ -60,19 +43,14 @@ class ComentarioAdmin(BaseCrudView):
         """
         Rota para carregar o template do formulário e criar um objeto [GET, POST]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
+        context = get_contexto(request)
 
         comentario_controller: ComentarioController = ComentarioController(request)
 
         # Se o request for GET
         if request.method == 'GET':
             # Adicionar o request e os posts no context
-            posts = await comentario_controller.get_objetos(model_obj=PostModel)
+            posts = await comentario_controller.get_opcoes_posts()
             context.update({"posts": posts})
             return settings.TEMPLATES.TemplateResponse(f"admin/comentario/create.html", context=context)
         
@@ -87,7 +65,7 @@ class ComentarioAdmin(BaseCrudView):
             id_post: int = form.get('post')
             autor: str = form.get('autor')
             texto: str = form.get('texto')
-            posts = await comentario_controller.get_objetos(model_obj=PostModel)
+            posts = await comentario_controller.get_opcoes_posts(id_selecionado=int(id_post) if id_post and id_post.isdigit() else None)
             dados = {"id_post": id_post, "autor": autor, "texto": texto}
             context.update({"error": err, "posts": posts, "objeto": dados})
             return settings.TEMPLATES.TemplateResponse("admin/comentario/create.html", context=context)
@@ -100,12 +78,7 @@ class ComentarioAdmin(BaseCrudView):
         Rota para carregar o template do formulário de edição e atualizar um comentário [GET, POST]
         """
 
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
+        context = get_contexto(request)
 
         comentario_controller: ComentarioController = ComentarioController(request)
 
@@ -116,19 +89,19 @@ class ComentarioAdmin(BaseCrudView):
             return await super().object_details(object_controller=comentario_controller, obj_id=comentario_id)
         
         elif request.method == 'GET' and 'edit' in str(comentario_controller.request.url):
-            comentario = await comentario_controller.get_one_crud(id_obj=comentario_id)
+            comentario = await comentario_controller.get_one_crud(id_obj=comentario_id, edicao=True)
 
             if not comentario:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
             
             # Adicionar o request e os posts no context
-            posts = await comentario_controller.get_objetos(model_obj=PostModel)
+            posts = await comentario_controller.get_opcoes_posts(id_selecionado=comentario.id_post)
             context.update({"objeto": comentario, "posts": posts})
 
             return settings.TEMPLATES.TemplateResponse(f"admin/comentario/edit.html", context=context)
         
         # Se o request for POST
-        comentario = await comentario_controller.get_one_crud(id_obj=comentario_id)
+        comentario = await comentario_controller.get_one_crud(id_obj=comentario_id, edicao=True)
 
         if not comentario:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
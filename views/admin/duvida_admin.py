@@ -9,7 +9,7 @@ from fastapi.exceptions import HTTPException
 
 from core.configs import settings
 from controllers.duvida_controller import DuvidaController
-from core.deps import valida_login
+from core.deps import get_contexto
 from views.admin.base_crud_view import BaseCrudView
 from models.area_model import AreaModel
 
@@ -26,14 +26,6 @@ class DuvidaAdmin(BaseCrudView):
         """
         Rota para listar todos as dúvidas [GET]
         """
-
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-
         duvida_controller: DuvidaController = DuvidaController(request)
 
         return await super().object_list(object_controller=duvida_controller)
@@ -43,13 +35,6 @@ class DuvidaAdmin(BaseCrudView):
         """
         Rota para deletar uma dúvida [DELETE]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-
         duvida_controller: DuvidaController = DuvidaController(request)
 
         duvida_id: int = request.path_params["obj_id"]
@@ -61,19 +46,14 @@ class DuvidaAdmin(BaseCrudView):
         """
         Rota para carregar o template do formulário e criar um objeto [GET, POST]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
+        context = get_contexto(request)
 
         duvida_controller: DuvidaController = DuvidaController(request)
 
         # Se o request for GET
         if request.method == 'GET':
             # Adicionar o request e as áreas no context
-            areas = await duvida_controller.get_objetos(model_obj=AreaModel)
+            areas = await duvida_controller.get_opcoes(model_obj=AreaModel, coluna_label='area')
             context.update({"areas": areas})
 
             return settings.TEMPLATES.TemplateResponse(f"admin/duvida/create.html", context=context)
@@ -100,12 +80,7 @@ class DuvidaAdmin(BaseCrudView):
         """
         Rota para carregar o template do formulário de edição e atualizar uma dúvida [GET, POST]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
+        context = get_contexto(request)
 
         duvida_controller: DuvidaController = DuvidaController(request)
 
@@ -116,19 +91,19 @@ class DuvidaAdmin(BaseCrudView):
             return await super().object_details(object_controller=duvida_controller, obj_id=duvida_id)
 
         elif request.method == 'GET' and 'edit' in str(duvida_controller.request.url):
-            duvida = await duvida_controller.get_one_crud(id_obj=duvida_id)
+            duvida = await duvida_controller.get_one_crud(id_obj=duvida_id, edicao=True)
 
             if not duvida:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
             
             # Adicionar o request e as áreas no context
-            areas = await duvida_controller.get_objetos(model_obj=AreaModel)
+            areas = await duvida_controller.get_opcoes(model_obj=AreaModel, coluna_label='area')
             context.update({"objeto": duvida, "areas": areas})
 
             return settings.TEMPLATES.TemplateResponse(f"admin/duvida/edit.html", context=context)
         
         # Se o request for POST
-        duvida = await duvida_controller.get_one_crud(id_obj=duvida_id)
+        duvida = await duvida_controller.get_one_crud(id_obj=duvida_id, edicao=True)
 
         if not duvida:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
@@ -8,7 +8,7 @@ from fastapi.exceptions import HTTPException
 from core.configs import settings
 from controllers.membro_controller import MembroController
 from views.admin.base_crud_view import BaseCrudView
-from core.deps import valida_login
+from core.deps import get_contexto
 
 
 class MembroAdmin(BaseCrudView):
@@ -22,13 +22,6 @@ class MembroAdmin(BaseCrudView):
         """
         Rota para listar todos os membros [GET]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-
         membro_controller: MembroController = MembroController(request)
 
         return await super().object_list(object_controller=membro_controller)
@@ -38,14 +31,6 @@ class MembroAdmin(BaseCrudView):
         """
         Rota para deletar um membro [DELETE]
         """
-
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-
         membro_controller: MembroController = MembroController(request)
 
         membro_id: int = request.path_params["obj_id"]
@@ -58,12 +43,7 @@ class MembroAdmin(BaseCrudView):
         Rota para carregar o template do formulário e criar um objeto [GET, POST]
         """
 
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
+        context = get_contexto(request)
 
         membro_controller: MembroController = MembroController(request)
 
@@ -95,13 +75,7 @@ class MembroAdmin(BaseCrudView):
         Rota para carregar o template do formulário de edição e atualizar um membro [GET, POST]
         """
 
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-
+        context = get_contexto(request)
 
         membro_controller: MembroController = MembroController(request)
 
@@ -112,7 +86,7 @@ class MembroAdmin(BaseCrudView):
             return await super().object_details(object_controller=membro_controller, obj_id=membro_id)
         
         # Se o request for POST
-        membro = await membro_controller.get_one_crud(id_obj=membro_id)
+        membro = await membro_controller.get_one_crud(id_obj=membro_id, edicao=True)
 
         if not membro:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
@@ -129,7 +103,7 @@ class MembroAdmin(BaseCrudView):
             email: str = form.get('email')
             senha: str = form.get('senha')
             dados = {"id": membro_id, "nome": nome, "funcao": funcao, "email": email, "senha": senha}
-            context.update({"error": err, "dados": dados})
+            context.update({"error": err, "objeto": dados})
             return settings.TEMPLATES.TemplateResponse("admin/membro/edit.html", context=context)
         
         return RedirectResponse(request.url_for("membro_list"), status_code=status.HTTP_302_FOUND)
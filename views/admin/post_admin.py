@@ -10,7 +10,9 @@ from fastapi.exceptions import HTTPException
 
 from core.configs import settings
 from controllers.post_controller import PostController
-from core.deps import valida_login
+from controllers.comentario_controller import ComentarioController
+from controllers.base_controller import BaseController, Pagina
+from core.deps import get_contexto
 from views.admin.base_crud_view import BaseCrudView
 
 from models.autor_model import AutorModel
@@ -28,29 +30,30 @@ class PostAdmin(BaseCrudView):
         """
         Rota para listar todos os posts [GET]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-
         post_controller: PostController = PostController(request)
 
         return await super().object_list(object_controller=post_controller)
 
 
-    async def object_delete(self, request: Request) -> Response:
+    async def contexto_detalhes(self, object_controller: BaseController, objeto: object) -> dict:
         """
-        Rota para deletar um post [DELETE]
+        Uma página dos comentários do post (?cursor=<cursor>&dir=anterior); o total vem do contador do post
         """
-        context = await valida_login(request)
+        comentario_controller: ComentarioController = ComentarioController(object_controller.request)
+        params = object_controller.request.query_params
+
         try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
+            comentarios = await comentario_controller.get_comentarios_post(id_post=objeto.id, cursor=params.get('cursor'), anterior=params.get('dir') == 'anterior')
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+        return {"comentarios": comentarios.itens, "pagina": comentarios}
+
 
+    async def object_delete(self, request: Request) -> Response:
+        """
+        Rota para deletar um post [DELETE]
+        """
         post_controller: PostController = PostController(request)
 
         post_id: int = request.path_params["obj_id"]
@@ -62,20 +65,15 @@ class PostAdmin(BaseCrudView):
         """
         Rota para carregar o template do formulário e criar um objeto [GET, POST]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
+        context = get_contexto(request)
 
         post_controller: PostController = PostController(request)
 
         # Se o request for GET
         if request.method == 'GET':
             # Adicionar o request, os autores e as tags no context
-            autores = await post_controller.get_objetos(model_obj=AutorModel)
-            tags = await post_controller.get_objetos(model_obj=TagModel)
+            autores = await post_controller.get_opcoes(model_obj=AutorModel, coluna_label='nome')
+            tags = await post_controller.get_opcoes(model_obj=TagModel, coluna_label='tag')
             context.update({"autores": autores, "tags": tags})
             return settings.TEMPLATES.TemplateResponse(f"admin/post/create.html", context=context)
         
@@ -102,12 +100,7 @@ class PostAdmin(BaseCrudView):
         """
         Rota para carregar o template do formulário de edição e atualizar um post [GET, POST]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
+        context = get_contexto(request)
 
         post_controller: PostController = PostController(request)
 
@@ -118,20 +111,20 @@ class PostAdmin(BaseCrudView):
             return await super().object_details(object_controller=post_controller, obj_id=post_id)
         
         elif request.method == 'GET' and 'edit' in str(post_controller.request.url):
-            post = await post_controller.get_one_crud(id_obj=post_id)
+            post = await post_controller.get_one_crud(id_obj=post_id, edicao=True)
 
             if not post:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
             
             # Adicionar o request, os autores e as tags no context
-            autores = await post_controller.get_objetos(model_obj=AutorModel)
-            tags = await post_controller.get_objetos(model_obj=TagModel)
+            autores = await post_controller.get_opcoes(model_obj=AutorModel, coluna_label='nome')
+            tags = await post_controller.get_opcoes(model_obj=TagModel, coluna_label='tag')
             context.update({"objeto": post, "tags": tags, "autores": autores})
 
             return settings.TEMPLATES.TemplateResponse(f"admin/post/edit.html", context=context)
         
         # Se o request for POST
-        post = await post_controller.get_one_crud(id_obj=post_id)
+        post = await post_controller.get_one_crud(id_obj=post_id, edicao=True)
 
         if not post:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
@@ -148,7 +141,7 @@ class PostAdmin(BaseCrudView):
             texto: str = form.get('texto')
             autor: int = form.get('autor')
             dados = {"id": post_id, "titulo": titulo, "tags": tags, "texto": texto, "autor": autor}
-            context.update({"error": err, "dados": dados})
+            context.update({"error": err, "objeto": dados})
             return settings.TEMPLATES.TemplateResponse("admin/post/edit.html", context=context)
         
         return RedirectResponse(request.url_for("post_list"), status_code=status.HTTP_302_FOUND)
@@ -9,7 +9,7 @@ from fastapi.exceptions import HTTPException
 
 from core.configs import settings
 from controllers.projeto_controller import ProjetoController
-from core.deps import valida_login
+from core.deps import get_contexto
 from views.admin.base_crud_view import BaseCrudView
 
 
@@ -25,13 +25,6 @@ class ProjetoAdmin(BaseCrudView):
         """
         Rota para listar todos os projetos [GET]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-
         projeto_controller: ProjetoController = ProjetoController(request)
 
         return await super().object_list(object_controller=projeto_controller)
@@ -41,13 +34,6 @@ class ProjetoAdmin(BaseCrudView):
         """
         Rota para deletar um projeto [DELETE]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-
         projeto_controller: ProjetoController = ProjetoController(request)
 
         projeto_id: int = request.path_params["obj_id"]
@@ -59,12 +45,7 @@ class ProjetoAdmin(BaseCrudView):
         """
         Rota para carregar o template do formulário e criar um objeto [GET, POST]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
+        context = get_contexto(request)
 
         projeto_controller: ProjetoController = ProjetoController(request)
 
@@ -94,12 +75,7 @@ class ProjetoAdmin(BaseCrudView):
         """
         Rota para carregar o template do formulário de edição e atualizar um projeto [GET, POST]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
+        context = get_contexto(request)
 
         projeto_controller: ProjetoController = ProjetoController(request)
 
@@ -110,7 +86,7 @@ class ProjetoAdmin(BaseCrudView):
             return await super().object_details(object_controller=projeto_controller, obj_id=projeto_id)
         
         # Se o request for POST
-        projeto = await projeto_controller.get_one_crud(id_obj=projeto_id)
+        projeto = await projeto_controller.get_one_crud(id_obj=projeto_id, edicao=True)
 
         if not projeto:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
@@ -126,7 +102,7 @@ class ProjetoAdmin(BaseCrudView):
             descricao_inicial: str = form.get('descricao_inicial')
             descricao_final: str = form.get('descricao_final')
             dados = {"id": projeto_id, "titulo": titulo, "descricao_inicial": descricao_inicial, "descricao_final": descricao_final}
-            context.update({"error": err, "dados": dados})
+            context.update({"error": err, "objeto": dados})
             return settings.TEMPLATES.TemplateResponse("admin/projeto/edit.html", context=context)
         
         return RedirectResponse(request.url_for("projeto_list"), status_code=status.HTTP_302_FOUND)
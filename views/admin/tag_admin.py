@@ -8,8 +8,9 @@ from fastapi.responses import Response, RedirectResponse
 from fastapi.exceptions import HTTPException
 
 from core.configs import settings
+from controllers.base_controller import BaseController, Pagina
 from controllers.tag_controller import TagController
-from core.deps import valida_login
+from core.deps import get_contexto
 from views.admin.base_crud_view import BaseCrudView
 
 
@@ -25,29 +26,22 @@ class TagAdmin(BaseCrudView):
         """
         Rota para listar todos as tags [GET]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-
         tag_controller: TagController = TagController(request)
 
         return await super().object_list(object_controller=tag_controller)
 
 
+    async def contexto_lista(self, object_controller: BaseController, pagina: Pagina) -> dict:
+        """
+        Nuvem com as tags mais usadas, lida do contador total_posts (só pelo índice)
+        """
+        return {"nuvem": await object_controller.get_nuvem()}
+
+
     async def object_delete(self, request: Request) -> Response:
         """
         Rota para deletar uma tag [DELETE]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-
         tag_controller: TagController = TagController(request)
 
         tag_id: int = request.path_params["obj_id"]
@@ -59,12 +53,7 @@ class TagAdmin(BaseCrudView):
         """
         Rota para carregar o template do formulário e criar um objeto [GET, POST]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
+        context = get_contexto(request)
 
         tag_controller: TagController = TagController(request)
 
@@ -92,12 +81,7 @@ class TagAdmin(BaseCrudView):
         """
         Rota para carregar o template do formulário de edição e atualizar uma tag [GET, POST]
         """
-        context = await valida_login(request)
-        try:
-            if not context["membro"]:
-                return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
-        except KeyError:
-            return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context=context, status_code=status.HTTP_404_NOT_FOUND)
+        context = get_contexto(request)
 
         tag_controller: TagController = TagController(request)
 
@@ -108,7 +92,7 @@ class TagAdmin(BaseCrudView):
             return await super().object_details(object_controller=tag_controller, obj_id=tag_id)
         
         # Se o request for POST
-        tag_obj = await tag_controller.get_one_crud(id_obj=tag_id)
+        tag_obj = await tag_controller.get_one_crud(id_obj=tag_id, edicao=True)
 
         if not tag_obj:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
@@ -1,8 +1,12 @@
+from datetime import datetime
+
 from fastapi import status
 from fastapi.exceptions import HTTPException
 from fastapi.requests import Request
 
 from core.configs import settings
+from core.deps import LoginNecessarioError
+from core.servico_hash import FilaHashCheiaError
 
 
 async def not_found(request: Request, ext: HTTPException):
@@ -33,7 +37,32 @@ async def server_error(request: Request, ext: HTTPException):
     return settings.TEMPLATES.TemplateResponse(template, context, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR) 
 
 
+async def login_necessario(request: Request, ext: LoginNecessarioError):
+    """
+    Retorna a página limbo para acessos ao admin sem login
+    """
+    context = {"request": request, "ano": datetime.now().year}
+
+    return settings.TEMPLATES.TemplateResponse('admin/limbo.html', context, status_code=status.HTTP_404_NOT_FOUND)
+
+
+async def servico_indisponivel(request: Request, ext: Exception):
+    """
+    Retorna uma página 503 quando a fila de hashing de senhas está cheia
+    """
+    if 'admin' in str(request.url):
+        template = 'admin/500.html'
+    else:
+        template = '500.html'
+
+    context = {"request": request}
+
+    return settings.TEMPLATES.TemplateResponse(template, context, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
 exception_handlers = {
     404: not_found,
-    500: server_error
+    500: server_error,
+    LoginNecessarioError: login_necessario,
+    FilaHashCheiaError: servico_indisponivel
 }
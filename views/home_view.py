@@ -5,6 +5,7 @@ from fastapi import status
 from fastapi.exceptions import HTTPException
 from controllers.membro_controller import MembroController
 from core.auth import set_auth, unset_auth
+from core.limitador import limitador_login
 
 from core.configs import settings
 
@@ -101,13 +102,22 @@ async def get_login(request: Request) -> Response:
 
 @router.post('/login', name='post_login')
 async def post_login(request: Request) -> Response:
-    membro_controller: MembroController = MembroController(request)
-
     #Receber dados do form
     form = await request.form()
     email: str = form.get('email')
     senha: str = form.get('senha')
 
+    # Barra tentativas acima do limite antes de qualquer consulta ou hash
+    ip: str = request.client.host if request.client else ''
+    if not await limitador_login.permitir(ip=ip, email=email):
+        context = {
+            "request": request,
+            "error": "Muitas tentativas de login. Aguarde alguns minutos e tente novamente."
+        }
+        return settings.TEMPLATES.TemplateResponse('login.html', context=context, status_code=status.HTTP_429_TOO_MANY_REQUESTS)
+
+    membro_controller: MembroController = MembroController(request)
+
     membro = await membro_controller.login_membro(email=email, senha=senha)
 
     if not membro:
@@ -116,7 +126,7 @@ async def post_login(request: Request) -> Response:
     response = RedirectResponse(request.url_for('admin_index'), status_code=status.HTTP_302_FOUND)
     
     #Adiciona o cookie na response
-    set_auth(response=response, membro_id=membro.id)
+    set_auth(response=response, membro=membro)
     return response
 
 